@@ -0,0 +1,101 @@
+import hashlib
+import os
+import sys
+
+import streamlit as st
+
+# Local, pre-optimized copies of the images the pages show.
+# The bundled banner is converted into WebP variants of a few widths, named after the
+# source's content hash (OnlineLearning-960w.<hash>.webp), in ./static, which Streamlit
+# serves at app/static/ when server.enableStaticServing is on (.streamlit/config.toml).
+# The page then shows an <img srcset> so browsers pick the smallest variant that fits.
+# Hashed names never change content, so they can be cached for good. Streamlit has no
+# setting for the headers of app/static/ (it answers with ETag / Last-Modified only, so
+# browsers revalidate on every visit); set them in the reverse proxy in front of the app,
+# e.g. for nginx, next to the location that proxies the rest of the app:
+#
+#   location ~ /app/static/ {
+#       proxy_pass http://127.0.0.1:8501;
+#       proxy_hide_header Cache-Control;
+#       add_header Cache-Control "public, max-age=31536000, immutable" always;
+#   }
+#
+# Variants are built once, at startup (Prewarm) or with `python Assets.py`; if that fails
+# the page shows the bundled JPEG instead. Nothing is fetched over the network.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BANNER = os.path.join(HERE, "OnlineLearning.jpg")
+
+STATIC_DIR = os.path.join(HERE, "static")
+
+# Variant widths in pixels (widths above the source's own are skipped; the source width is always added)
+WIDTHS = (480, 800, 1200)
+
+WEBP_QUALITY = 80
+
+
+def build_variants(source, out_dir=STATIC_DIR, widths=WIDTHS):
+    # [(width, file name)] of the WebP variants of an image, generating the missing ones
+    from PIL import Image
+
+    with open(source, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    os.makedirs(out_dir, exist_ok=True)
+
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        sizes = sorted({w for w in widths if w < image.width} | {image.width})
+        variants = []
+        for width in sizes:
+            name = f"{stem}-{width}w.{digest}.webp"
+            path = os.path.join(out_dir, name)
+            if not os.path.exists(path):
+                height = round(image.height * width / image.width)
+                tmp = f"{path}.tmp{os.getpid()}"
+                image.resize((width, height), Image.LANCZOS).save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+                os.replace(tmp, path)
+            variants.append((width, name))
+
+    # variants of earlier versions of the image are no longer referenced
+    current = {name for _, name in variants}
+    for name in os.listdir(out_dir):
+        if name.startswith(f"{stem}-") and name.endswith(".webp") and name not in current:
+            os.remove(os.path.join(out_dir, name))
+    return variants
+
+
+@st.cache_resource(show_spinner=False)
+def banner_variants():
+    # WebP variants of the banner, or [] when they cannot be built (the JPEG is shown instead)
+    try:
+        return build_variants(BANNER)
+    except (OSError, ImportError, ValueError):
+        return []
+
+
+def show_banner(alt="Online learning"):
+    # Full-width banner: responsive local WebP variants when static serving is on, else the bundled JPEG
+    variants = banner_variants() if st.get_option("server.enableStaticServing") else []
+    if not variants:
+        st.image(BANNER, use_container_width=True)
+        return
+    srcset = ", ".join(f"app/static/{name} {width}w" for width, name in variants)
+    largest = variants[-1]
+    st.markdown(
+        f'<img src="app/static/{largest[1]}" srcset="{srcset}" sizes="(max-width: 736px) 100vw, 736px" '
+        f'width="{largest[0]}" style="width: 100%; height: auto;" alt="{alt}">',
+        unsafe_allow_html=True,
+    )
+
+
+def main():
+    for width, name in build_variants(BANNER):
+        size = os.path.getsize(os.path.join(STATIC_DIR, name))
+        print(f"{name:48} {width:5}px {size / 1024:7.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,11 @@
+import time
+
 import streamlit as st
+from PageTimings import begin_page, end_page
+from CrossFilter import render_filter_sidebar
+from Prewarm import start_prewarm
+from SurveyAppend import start_drop_watcher
+from SurveyCube import stream_progress
 
 st.set_page_config(
     page_title="Online Learning Survey"
@@ -10,12 +17,38 @@ page2 = st.Page('PerformanceImpact.py', title='Impact of Online Learning', icon=
 
 page3 = st.Page('StudentChallenge.py', title='Challenge During Online Learning', icon=":material/outlined_flag:")
 
+page4 = st.Page('AssociationMatrix.py', title='Associations Between Answers', icon=":material/grid_on:")
+
+page5 = st.Page('CrosstabExplorer.py', title='Crosstab Explorer', icon=":material/table_chart:")
+
 home = st.Page('Homepage.py', title='Homepage', default=True, icon=":material/home:")
 
 pg = st.navigation(
         {
-            "Menu": [home, page1, page2, page3]
+            "Menu": [home, page1, page2, page3, page4, page5]
         }
     )
 
+# Warm the data, cube and figure caches in the background (once per process; Serve.py
+# starts this before the first visitor arrives)
+start_prewarm()
+
+# New response batches dropped into SURVEY_DROP_DIR are folded in as they arrive
+start_drop_watcher()
+
+# While a streamed survey is still loading, the pages show the responses read so far
+loading = stream_progress()
+if loading is not None:
+    st.caption(f"Loading the survey: {loading:,} responses so far. The charts update as more arrive.")
+
+# Sidebar filters shared by every page
+render_filter_sidebar()
+
+# Stage timings of the page run (only collected with SURVEY_TIMINGS=1 or ?debug=1)
+begin_page(pg.title)
 pg.run()
+end_page()
+
+if loading is not None:
+    time.sleep(1)
+    st.rerun()
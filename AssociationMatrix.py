@@ -0,0 +1,98 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from Associations import association_matrix, pair_table, strongest_pairs
+from DataExport import export_buttons
+from PageWidgets import selector_fragment
+from PageTimings import lap, show_chart
+from SurveySchema import COLUMNS
+from SurveyStats import describe_chi_square
+
+lap("imports")
+
+st.header("Associations Between All Survey Answers")
+
+st.write(
+    """
+    The other pages look at a few hand-picked pairs of questions. This page measures the association between every pair of the 23 survey questions, including device type, sleep time, social media, gaming and sports. Pairs of ordered answers (scales, hours, marks) are measured with Spearman's rank correlation, from -1 to 1; all other pairs with Cramér's V, from 0 (independent) to 1. The matrix covers all responses; the sidebar filters do not apply here.
+    """
+)
+
+# Contingency tables of all column pairs and their association, built once per dataset version
+matrix = association_matrix()
+
+lap("layout")
+
+# Heatmap of the whole matrix (the diagonal is left blank)
+values = matrix["values"].copy()
+np.fill_diagonal(values, np.nan)
+
+lap("transform", "association_matrix")
+
+def association_matrix_figure():
+    fig = go.Figure(
+        go.Heatmap(
+            z=values,
+            x=COLUMNS,
+            y=COLUMNS,
+            customdata=matrix["methods"],
+            zmin=-1,
+            zmax=1,
+            colorscale='RdBu_r',
+            colorbar=dict(title="Association"),
+            hovertemplate='%{y}<br>%{x}<br>%{customdata}: %{z:.2f}<extra></extra>'
+        )
+    )
+
+    fig.update_layout(
+        title='Association Between Every Pair of Survey Questions',
+        height=800,
+        xaxis=dict(tickangle=45, tickfont=dict(size=9)),
+        yaxis=dict(autorange='reversed', tickfont=dict(size=9)),
+        margin=dict(l=20, r=20, t=60, b=20)
+    )
+    return fig
+
+show_chart("association_matrix", association_matrix_figure, filters=False, use_container_width=True)
+export_buttons("association_matrix", pd.DataFrame(matrix["values"], index=pd.Index(COLUMNS, name="Question"), columns=COLUMNS))
+
+st.subheader("Which answers go together?")
+
+# Pairs, strongest association first
+pairs = strongest_pairs(matrix)
+pair_labels = {f"{a} × {b}": (a, b, method, value) for a, b, method, value in pairs}
+
+
+# Drill down into one pair: its statistic and contingency table
+def render_pair(label):
+    a, b, method, value = pair_labels[label]
+    table = pair_table(matrix, a, b)
+
+    lap("transform", "association_pair")
+
+    def association_pair_figure():
+        fig = go.Figure(
+            go.Heatmap(
+                z=table.to_numpy(),
+                x=[str(c) for c in table.columns],
+                y=[str(i) for i in table.index],
+                colorscale='Blues',
+                colorbar=dict(title="Students"),
+                hovertemplate=f'{a}: %{{y}}<br>{b}: %{{x}}<br>Students: %{{z}}<extra></extra>'
+            )
+        )
+        fig.update_layout(
+            title=f"{method} = {value:.2f}",
+            xaxis=dict(title=b, type='category'),
+            yaxis=dict(title=a, type='category', autorange='reversed'),
+            height=500
+        )
+        return fig
+
+    show_chart("association_pair", association_pair_figure, state=(label,), filters=False, use_container_width=True)
+    export_buttons("association_pair", table, state=(label,))
+    st.caption(f"{describe_chi_square(table)}. {int(table.to_numpy().sum()):,} students answered both questions.")
+
+
+selector_fragment("Select a pair of questions", list(pair_labels), render_pair)
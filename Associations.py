@@ -0,0 +1,167 @@
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import SurveyData
+from PageTimings import span
+from SurveyCube import BACKEND, appended_batches, data_version
+from SurveySchema import COLUMNS, SCHEMA, codes, domain
+from SurveyStats import chi_square
+
+# Association of every pair of survey columns.
+# The contingency tables of all 253 column pairs are filled together, like the cube: every
+# column is coded as positions in its domain, each pair's codes are combined into one flat
+# index into that pair's block, and a single bincount per row chunk counts all pairs at once.
+# Ordinal pairs (integer scales, ordered answers) are measured by Spearman's rank
+# correlation and all others by Cramér's V, both computed from the tables. The survey is
+# counted once per dataset version; batches appended to it later are counted on their own
+# and added to those counts.
+
+# Columns with a natural order: integer scales and ordered categoricals (Yes/No answers are not)
+ORDINAL = {
+    col for col, dtype in SCHEMA.items()
+    if not isinstance(dtype, pd.CategoricalDtype) or dtype.ordered
+}
+
+PAIRS = list(itertools.combinations(range(len(COLUMNS)), 2))
+
+# Rows per bincount: every row contributes one index per pair
+CHUNK_ROWS = 20_000
+
+
+def _layout():
+    sizes = np.array([len(domain(col)) for col in COLUMNS])
+    first = np.array([i for i, _ in PAIRS])
+    second = np.array([j for _, j in PAIRS])
+    blocks = sizes[first] * sizes[second]
+    offsets = np.concatenate([[0], np.cumsum(blocks)[:-1]])
+    return sizes, first, second, offsets, int(blocks.sum())
+
+
+_SIZES, _FIRST, _SECOND, _OFFSETS, _SIZE = _layout()
+
+
+def pair_counts(chunks):
+    # Flat counts of every pair's contingency table over an iterable of survey frames
+    counts = np.zeros(_SIZE, dtype=np.int64)
+    for chunk in chunks:
+        for start in range(0, len(chunk), CHUNK_ROWS):
+            part = chunk.iloc[start:start + CHUNK_ROWS]
+            row_codes = np.stack([codes(part[col]) for col in COLUMNS])
+            a, b = row_codes[_FIRST], row_codes[_SECOND]
+            flat = a * _SIZES[_SECOND, None] + b + _OFFSETS[:, None]
+            # rows missing either answer land in the overflow slot _SIZE
+            index = np.where((a >= 0) & (b >= 0), flat, _SIZE)
+            counts += np.bincount(index.ravel(), minlength=_SIZE + 1)[:_SIZE]
+    return counts
+
+
+def _block(counts, pair):
+    i, j = PAIRS[pair]
+    offset = _OFFSETS[pair]
+    return counts[offset:offset + _SIZES[i] * _SIZES[j]].reshape(_SIZES[i], _SIZES[j])
+
+
+def cramers_v(table):
+    # Cramér's V of a contingency table (0 = independent, 1 = one answer determines the other)
+    table = np.asarray(table, dtype=float)
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    k = min(table.shape) - 1
+    if k < 1:
+        return np.nan
+    statistic, _, _ = chi_square(table)
+    return float(np.sqrt(statistic / (table.sum() * k)))
+
+
+def _midranks(marginal):
+    # Average rank of each value given how many rows hold it
+    cumulative = np.cumsum(marginal)
+    return cumulative - (marginal - 1) / 2
+
+
+def spearman(table):
+    # Spearman's rank correlation of two ordered variables from their contingency table (ties get midranks)
+    table = np.asarray(table, dtype=float)
+    n = table.sum()
+    if n == 0:
+        return np.nan
+    rows, cols = table.sum(axis=1), table.sum(axis=0)
+    row_ranks = _midranks(rows) - (n + 1) / 2
+    col_ranks = _midranks(cols) - (n + 1) / 2
+    covariance = row_ranks @ table @ col_ranks
+    spread = np.sqrt((rows * row_ranks ** 2).sum() * (cols * col_ranks ** 2).sum())
+    return float(covariance / spread) if spread > 0 else np.nan
+
+
+def _measure(i, j):
+    return "Spearman" if COLUMNS[i] in ORDINAL and COLUMNS[j] in ORDINAL else "Cramér's V"
+
+
+def _chunks():
+    # Survey frames of the current version
+    if BACKEND == "memory" and not SurveyData.STREAMING:
+        return [SurveyData.load_survey_with_hash()[1]]
+    return SurveyData.iter_survey_chunks()[1]
+
+
+# digest -> (pair counts, appended batches folded in), for the current version only
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def _counts_for(digest, appended):
+    # Pair counts of a dataset version and its first `appended` batches
+    with _counts_lock:
+        entry = _counts.get(digest)
+    if entry is None:
+        counts, folded = pair_counts(_chunks()), 0
+    else:
+        counts, folded = entry
+    if folded < appended:
+        # only the new batches are counted (into a new array: older matrices hold the old one)
+        counts = counts + pair_counts(appended_batches(digest, folded, appended))
+    with _counts_lock:
+        if digest not in _counts or _counts[digest][1] < appended:
+            _counts.clear()
+            _counts[digest] = (counts, appended)
+    return counts
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _matrix_for(version):
+    with span("associations"):
+        counts = _counts_for(*version)
+    n = len(COLUMNS)
+    values = np.eye(n)
+    methods = np.full((n, n), "", dtype=object)
+    for pair, (i, j) in enumerate(PAIRS):
+        table = _block(counts, pair)
+        method = _measure(i, j)
+        values[i, j] = values[j, i] = spearman(table) if method == "Spearman" else cramers_v(table)
+        methods[i, j] = methods[j, i] = method
+    return {"counts": counts, "values": values, "methods": methods}
+
+
+def association_matrix():
+    # {"counts", "values" (columns x columns), "methods"} for the data the pages currently show
+    return _matrix_for(data_version())
+
+
+def strongest_pairs(matrix):
+    # [(column a, column b, measure, value)], strongest association first
+    values = matrix["values"]
+    pairs = [(COLUMNS[i], COLUMNS[j], matrix["methods"][i, j], values[i, j]) for i, j in PAIRS]
+    return sorted(pairs, key=lambda p: -abs(p[3]) if not np.isnan(p[3]) else 0.0)
+
+
+def pair_table(matrix, a, b):
+    # Contingency table of two columns (rows: a, columns: b) without empty rows or columns
+    i, j = COLUMNS.index(a), COLUMNS.index(b)
+    block = _block(matrix["counts"], PAIRS.index((min(i, j), max(i, j))))
+    if i > j:
+        block = block.T
+    table = pd.DataFrame(block, index=pd.Index(domain(a), name=a), columns=pd.Index(domain(b), name=b))
+    return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
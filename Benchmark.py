@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.testing.v1 import AppTest
+
+import Associations
+import CrossFilter
+import DataExport
+import FigureCache
+import ResultCache
+import SurveyData
+import SurveyStats
+import SyntheticSurvey
+from CrossFilter import filtered_chunks
+from SurveyCube import data_version, get_cube
+
+# Headless render benchmark of every dashboard page.
+# Each page is rendered through Streamlit's app-testing harness against synthetic surveys
+# (SyntheticSurvey, learned from the bundled CSV) of several row counts, and the run is split into:
+#   load       - reading and parsing the CSV (SurveyData)
+#   transform  - building the aggregate cube (SurveyCube)
+#   figures    - the rest of the page script, mostly Plotly figure construction
+#   serialize  - time spent serializing figures for the figure cache and inside st.plotly_chart
+# plus the figure payload size and peak traced memory (from a second, traced render).
+# Every size also times the export of all responses in each download format
+#   export     - writing the file chunk by chunk (DataExport), with its size as payload
+# Runs fully offline.
+#
+#   python Benchmark.py --sizes 1k,100k --save-baseline benchmark_baseline.json
+#   python Benchmark.py --sizes 1k,100k --compare benchmark_baseline.json
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = [
+    "Homepage.py", "StudentSatisfaction.py", "PerformanceImpact.py", "StudentChallenge.py",
+    "AssociationMatrix.py", "CrosstabExplorer.py",
+]
+
+# Formats of the full-survey export (DataExport) benchmarked after the pages
+EXPORTS = ["csv", "parquet"]
+
+DEFAULT_SIZES = "1k,100k,1M,10M"
+
+STAGES = ["load", "transform", "figures", "serialize", "export"]
+
+
+def synthetic_csv(rows, directory, seed=0):
+    # A synthetic survey of the requested number of rows, written as CSV
+    path = os.path.join(directory, f"survey_{rows}.csv")
+    SyntheticSurvey.write_csv(path, rows, seed=seed)
+    return path
+
+
+class _ChartTimer:
+    # Times every st.plotly_chart call made while active
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._originals = None
+
+    def _wrap(self, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+        return timed
+
+    def __enter__(self):
+        self._originals = (st.plotly_chart, DeltaGenerator.plotly_chart, FigureCache._serialize)
+        st.plotly_chart = self._wrap(st.plotly_chart)
+        DeltaGenerator.plotly_chart = self._wrap(DeltaGenerator.plotly_chart)
+        FigureCache._serialize = self._wrap(FigureCache._serialize)
+        return self
+
+    def __exit__(self, *exc):
+        st.plotly_chart, DeltaGenerator.plotly_chart, FigureCache._serialize = self._originals
+
+
+def _clear_caches():
+    # Every cache of the process, so each render starts cold (a second render of the same
+    # page and size would otherwise be answered from the first one's results)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    ResultCache.clear_caches()
+    for module in (CrossFilter, SurveyStats):
+        with module._cache_lock:
+            module._cache.clear()
+    with Associations._counts_lock:
+        Associations._counts.clear()
+
+
+def _render(page, csv_path, timeout):
+    # Cold render of a page: (stage timings, AppTest)
+    SurveyData.use_local_path(csv_path)
+    _clear_caches()
+
+    start = time.perf_counter()
+    SurveyData.load_survey_with_hash()
+    loaded = time.perf_counter()
+    get_cube()
+    transformed = time.perf_counter()
+
+    with _ChartTimer() as charts:
+        app = AppTest.from_file(os.path.join(HERE, page), default_timeout=timeout).run()
+    rendered = time.perf_counter()
+
+    if app.exception:
+        raise RuntimeError(f"{page} failed: {app.exception[0].value}")
+
+    timings = {
+        "load": loaded - start,
+        "transform": transformed - loaded,
+        "figures": rendered - transformed - charts.seconds,
+        "serialize": charts.seconds,
+    }
+    return timings, app
+
+
+def bench_page(page, csv_path, trace_memory=True, timeout=600):
+    # Stage timings (seconds), payload bytes and peak traced memory of a cold page render.
+    # Memory is measured in a second render, since tracemalloc slows Python code down a lot.
+    result, app = _render(page, csv_path, timeout)
+    result["payload_bytes"] = sum(len(chart.proto.spec) for chart in app.get("plotly_chart"))
+    result["peak_bytes"] = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            _render(page, csv_path, timeout)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _export(fmt, csv_path):
+    # Cold export of every response: (timings, file size)
+    SurveyData.use_local_path(csv_path)
+    _clear_caches()
+
+    start = time.perf_counter()
+    SurveyData.load_survey_with_hash()
+    loaded = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        DataExport.EXPORT_DIR = directory
+        path = DataExport.export_path("responses", lambda: filtered_chunks(()), data_version(), (), (), fmt)
+        exported = time.perf_counter()
+        size = os.path.getsize(path)
+    return {"load": loaded - start, "export": exported - loaded}, size
+
+
+def bench_export(fmt, csv_path, trace_memory=True):
+    # Stage timings, file size and peak traced memory of a cold export (memory from a second run)
+    result, size = _export(fmt, csv_path)
+    result["payload_bytes"] = size
+    result["peak_bytes"] = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            _export(fmt, csv_path)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run(sizes, pages, trace_memory=True, exports=EXPORTS):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            csv_path = synthetic_csv(rows, directory)
+            for page in pages:
+                results[f"{page}@{rows}"] = bench_page(page, csv_path, trace_memory)
+                print(_format_row(page, rows, results[f"{page}@{rows}"]), flush=True)
+            for fmt in exports:
+                name = f"export.{fmt}"
+                results[f"{name}@{rows}"] = bench_export(fmt, csv_path, trace_memory)
+                print(_format_row(name, rows, results[f"{name}@{rows}"]), flush=True)
+            os.remove(csv_path)
+    return results
+
+
+def _format_row(page, rows, result):
+    stages = "  ".join(f"{stage}={result[stage] * 1000:9.1f}ms" for stage in STAGES if stage in result)
+    peak = f"{result['peak_bytes'] / 2**20:8.1f}MiB" if result["peak_bytes"] is not None else "       -"
+    return f"{page:24} {rows:>10,}  {stages}  payload={result['payload_bytes'] / 1024:7.1f}KiB  peak={peak}"
+
+
+def compare(results, baseline, tolerance):
+    # Timings, payload sizes or peak memory more than `tolerance` (fraction) above the baseline
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in STAGES + ["payload_bytes", "peak_bytes"]:
+            old, new = baseline[key].get(metric), result.get(metric)
+            # ignore sub-millisecond timings, they are mostly noise
+            if old is None or new is None or (metric in STAGES and new < 1e-3):
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless per-page render benchmark of the dashboard.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated row counts, e.g. 1k,100k,1M,10M")
+    parser.add_argument("--pages", default=",".join(PAGES), help="comma separated page scripts")
+    parser.add_argument("--exports", default=",".join(EXPORTS), help="comma separated export formats (empty for none)")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster on large sizes)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [SyntheticSurvey.parse_rows(s) for s in args.sizes.split(",")]
+    exports = [fmt for fmt in args.exports.split(",") if fmt]
+    results = run(sizes, args.pages.split(","), trace_memory=not args.no_memory, exports=exports)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import numpy as np
+
+# Chart-ready summaries computed on the server, so figures carry a handful of bins or
+# box statistics instead of one value per survey response.
+# Distributions are given as (distinct values, counts), as read from SurveyCube.
+
+
+def histogram(values, counts, bins):
+    # NumPy histogram of a counted distribution: (counts per bin, bin edges)
+    return np.histogram(np.asarray(values, dtype=float), bins=bins, weights=np.asarray(counts))
+
+
+def _quantile(values, cumulative, p):
+    # Linear-interpolated quantile (numpy's default method) of the expanded distribution
+    position = (cumulative[-1] - 1) * p
+    below, above = int(np.floor(position)), int(np.ceil(position))
+    value_below = values[np.searchsorted(cumulative, below, side="right")]
+    value_above = values[np.searchsorted(cumulative, above, side="right")]
+    return value_below + (position - below) * (value_above - value_below)
+
+
+def box_stats(values, counts):
+    # Quartiles, Tukey whisker fences and outlying values, laid out like Plotly's box statistics
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts)
+    present = counts > 0
+    values, counts = values[present], counts[present]
+    if not len(values):
+        return None
+    cumulative = np.cumsum(counts)
+
+    q1, median, q3 = (_quantile(values, cumulative, p) for p in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": values[inside].min(),
+        "upperfence": values[inside].max(),
+        "outliers": values[~inside],
+    }
@@ -0,0 +1,223 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+import SurveyData
+from PageTimings import span
+from SurveyCube import BACKEND, CHUNK_ROWS, SurveyCube, appended_batches, appended_count, build_cube, fold_chunks, get_cube
+from SurveyData import dataset_hash, iter_survey_chunks, load_survey_with_hash
+from SurveySchema import codes, domain
+
+# Sidebar filters applied across every page.
+# For each dataset version every category of the filter columns (and every age) gets a
+# packed bitmap of the rows holding it. A filter combination is then an OR of bitmaps
+# within a column and an AND across columns, and the cube of the matching rows is
+# memoized per combination in a small LRU shared by all sessions.
+# With a SQL backend (SurveySql) the filter becomes the WHERE clause of the cube's queries,
+# and in streaming mode the matching rows of every chunk are folded in one pass over the file.
+# Appended response batches are folded into a cached filtered cube the next time it is used.
+
+AGE = "Age(Years)"
+
+FILTER_COLUMNS = [
+    "Gender",
+    "Home Location",
+    "Level of Education",
+    "Economic status",
+    "Device type used to attend classes",
+]
+
+# Filtered cubes kept in memory (across all sessions)
+CACHE_SIZE = int(os.environ.get("SURVEY_FILTER_CACHE", "64"))
+
+
+class BitmapIndex:
+    # Packed row bitmaps per category of the filter columns and per age
+
+    def __init__(self, df):
+        self.rows = len(df)
+        self.bitmaps = {}
+        for col in FILTER_COLUMNS + [AGE]:
+            row_codes = codes(df[col])
+            labels = domain(col)
+            present = np.flatnonzero(np.bincount(row_codes[row_codes >= 0], minlength=len(labels)))
+            self.bitmaps[col] = {labels[k]: np.packbits(row_codes == k) for k in present}
+
+    def _any_of(self, col, labels):
+        bits = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+        for label in labels:
+            if label in self.bitmaps[col]:
+                bits |= self.bitmaps[col][label]
+        return bits
+
+    def rows_matching(self, key):
+        # Row positions matching a filter key (see filter_key), or None for "all rows"
+        if not key:
+            return None
+        bits = None
+        for col, selection in key:
+            if col == AGE:
+                lo, hi = selection
+                selection = [age for age in self.bitmaps[AGE] if lo <= age <= hi]
+            column_bits = self._any_of(col, selection)
+            bits = column_bits if bits is None else bits & column_bits
+        return np.flatnonzero(np.unpackbits(bits, count=self.rows))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _index_for(digest, _df):
+    with span("bitmaps"):
+        return BitmapIndex(_df)
+
+
+def warm_filter_index():
+    # Build the filter bitmaps of the current dataset version before the first filter is chosen
+    if BACKEND == "memory" and not SurveyData.STREAMING:
+        digest, df = load_survey_with_hash()
+        _index_for(digest, df)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _chunk_mask(chunk, key):
+    # Rows of a survey chunk matching a filter key
+    mask = np.ones(len(chunk), dtype=bool)
+    for col, selection in key:
+        if col == AGE:
+            mask &= chunk[AGE].between(*selection).to_numpy()
+        else:
+            mask &= chunk[col].isin(selection).to_numpy()
+    return mask
+
+
+def filtered_batches(digest, key, start=0, stop=None):
+    # Rows matching a filter key in batches start:stop appended to a dataset version
+    for batch in appended_batches(digest, start, stop):
+        yield batch[_chunk_mask(batch, key)] if key else batch
+
+
+def filtered_chunks(key, appended=None):
+    # Survey frames holding the rows that match a filter key, then those of the first
+    # `appended` batches appended to it (all of them by default)
+    if SurveyData.STREAMING:
+        digest, chunks = iter_survey_chunks()
+        for chunk in chunks:
+            yield chunk[_chunk_mask(chunk, key)] if key else chunk
+    else:
+        digest, df = load_survey_with_hash()
+        rows = _index_for(digest, df).rows_matching(key)
+        if rows is None:
+            for start in range(0, len(df), CHUNK_ROWS):
+                yield df.iloc[start:start + CHUNK_ROWS]
+        else:
+            # at least one (possibly empty) frame, so consumers always see the columns
+            for start in range(0, max(len(rows), 1), CHUNK_ROWS):
+                yield df.take(rows[start:start + CHUNK_ROWS])
+    yield from filtered_batches(digest, key, 0, appended)
+
+
+def age_bounds(cube):
+    # Youngest and oldest age present in a cube, or None when it holds no ages
+    ages = cube.counts_for(AGE)
+    ages = ages[ages > 0].index
+    if len(ages) == 0:
+        return None
+    return int(ages.min()), int(ages.max())
+
+
+def filter_key(filters, all_ages=None):
+    # Canonical, hashable form of a filter dict; selections that keep everything are dropped
+    key = []
+    for col in FILTER_COLUMNS:
+        selected = filters.get(col)
+        if selected and set(selected) != set(domain(col)):
+            key.append((col, tuple(sorted(selected))))
+    age_range = filters.get(AGE)
+    if age_range:
+        lo, hi = int(age_range[0]), int(age_range[1])
+        if not (all_ages and lo <= all_ages[0] and hi >= all_ages[1]):
+            key.append((AGE, (lo, hi)))
+    return tuple(key)
+
+
+def filtered_cube(filters):
+    # Cube of the rows matching `filters` ({column: selected labels, AGE: (lo, hi)})
+    base = get_cube()
+    key = filter_key(filters, age_bounds(base))
+    if not key:
+        return base
+    digest = dataset_hash()
+    appended = appended_count(digest)
+    with _cache_lock:
+        entry = _cache.get((digest, key))
+        if entry is not None:
+            _cache.move_to_end((digest, key))
+    if entry is not None and entry[1] == appended:
+        return entry[0]
+
+    if entry is not None:
+        # Cached before the latest appends: only the new batches are folded in
+        cube, folded = entry
+    elif BACKEND != "memory":
+        cube, folded = base.where(key), 0
+    elif SurveyData.STREAMING:
+        _, chunks = iter_survey_chunks()
+        with span("cube"):
+            cube, folded = SurveyCube(), 0
+            for cube in fold_chunks(chunk[_chunk_mask(chunk, key)] for chunk in chunks):
+                pass
+    else:
+        _, df = load_survey_with_hash()
+        with span("filter"):
+            rows = _index_for(digest, df).rows_matching(key)
+        with span("cube"):
+            cube, folded = build_cube(df, rows), 0
+
+    for batch in appended_batches(digest, folded, appended):
+        cube = cube.merged(SurveyCube().add_rows(batch[_chunk_mask(batch, key)]))
+
+    with _cache_lock:
+        _cache[(digest, key)] = (cube, appended)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return cube
+
+
+def current_filters():
+    # Filters chosen in the sidebar of this session
+    filters = {col: st.session_state.get(f"filter:{col}") for col in FILTER_COLUMNS}
+    filters[AGE] = st.session_state.get(f"filter:{AGE}")
+    return filters
+
+
+def current_filter_key():
+    # Filter key of the filters chosen in the sidebar of this session
+    return filter_key(current_filters(), age_bounds(get_cube()))
+
+
+def current_cube():
+    # Cube for the page being rendered, with the sidebar filters applied
+    cube = filtered_cube(current_filters())
+    if cube.rows == 0:
+        st.info("No responses match the selected filters.")
+        st.stop()
+    return cube
+
+
+def render_filter_sidebar():
+    # Filter widgets, drawn once by the navigation app so they apply to every page
+    base = get_cube()
+    bounds = age_bounds(base)
+
+    with st.sidebar:
+        st.header("Filters")
+        for col in FILTER_COLUMNS:
+            st.multiselect(col, base.value_counts(col).index.tolist(), key=f"filter:{col}", placeholder="All")
+        # no slider without a range of ages to choose from (an empty or single-age survey)
+        if bounds is not None and bounds[0] < bounds[1]:
+            st.slider("Age (Years)", *bounds, value=bounds, key=f"filter:{AGE}")
@@ -0,0 +1,108 @@
+import streamlit as st
+import plotly.express as px
+from CrossFilter import current_filters
+from Crosstabs import NORMALIZATIONS, crosstab
+from DataExport import export_buttons
+from PageTimings import lap, show_chart
+from ResultCache import cache_stats
+from SurveySchema import COLUMNS
+from SurveyStats import describe_chi_square
+
+lap("imports")
+
+st.header("Crosstab Explorer")
+
+st.write(
+    """
+    Pick any two or three survey questions to see how their answers combine. The first question goes on the x-axis, the second is shown by colour and a third splits the chart into panels. Row % gives the share of each answer to the second question within every answer to the first; Column % the other way round. The sidebar filters apply.
+    """
+)
+
+CHART_TYPES = ["Grouped bars", "Stacked bars", "Heatmap", "Table"]
+
+lap("layout")
+
+
+# Widgets and chart rerun on their own when a selection changes
+@st.fragment
+def explorer():
+    dims = st.multiselect(
+        "Survey questions (two or three)",
+        COLUMNS,
+        default=['Your interaction in online mode', 'Your level of satisfaction in Online Education'],
+        max_selections=3,
+        key="explorer:columns"
+    )
+    col1, col2 = st.columns(2)
+    normalize = col1.radio(
+        "Show", list(NORMALIZATIONS), format_func=NORMALIZATIONS.get, horizontal=True, key="explorer:normalize"
+    )
+    chart_type = col2.selectbox("Chart type", CHART_TYPES, key="explorer:chart")
+
+    if len(dims) < 2:
+        st.info("Pick at least two questions.")
+        return
+
+    table = crosstab(dims, current_filters(), normalize)
+    if table['Students'].sum() == 0:
+        st.info("No responses match the selected filters.")
+        return
+    value = 'Students' if normalize == 'count' else 'Percent'
+
+    # answers as text, so numeric scales are drawn as categories in their own order
+    orders = {d: [str(v) for v in table[d].drop_duplicates()] for d in dims}
+    labelled = table.astype({d: str for d in dims})
+
+    lap("transform", "crosstab_explorer")
+
+    if chart_type == "Table":
+        st.dataframe(
+            labelled.pivot_table(index=dims[0], columns=dims[1:], values=value, sort=False),
+            use_container_width=True
+        )
+    else:
+        def crosstab_explorer_figure():
+            facet = dict(facet_col=dims[2], facet_col_wrap=3) if len(dims) == 3 else {}
+            if chart_type == "Heatmap":
+                fig = px.density_heatmap(
+                    labelled, x=dims[0], y=dims[1], z=value, histfunc='sum',
+                    category_orders=orders, color_continuous_scale='Blues', text_auto=True, **facet
+                )
+            else:
+                fig = px.bar(
+                    labelled, x=dims[0], y=value, color=dims[1],
+                    barmode='group' if chart_type == "Grouped bars" else 'relative',
+                    category_orders=orders, **facet
+                )
+            fig.update_layout(title=f"{dims[0]} vs {dims[1]}" + (f" by {dims[2]}" if len(dims) == 3 else ""))
+            return fig
+
+        show_chart(
+            "crosstab_explorer", crosstab_explorer_figure, state=(tuple(dims), normalize, chart_type),
+            use_container_width=True
+        )
+
+    export_buttons("crosstab", table, state=(tuple(dims), normalize))
+
+    if len(dims) == 2:
+        st.caption(describe_chi_square(table.pivot_table(index=dims[0], columns=dims[1], values='Students', sort=False)) + ".")
+
+    # Shared result caches (crosstabs, figures), for operators tuning SURVEY_CROSSTAB_CACHE
+    # and SURVEY_FIGURE_CACHE
+    with st.expander("Result caches"):
+        st.dataframe(
+            [
+                {
+                    "Cache": name,
+                    "Hit rate": f"{stats['hit_rate']:.0%}" if stats['hit_rate'] is not None else "–",
+                    "Entries": f"{stats['entries']} / {stats['max_entries']}",
+                    "Evictions": stats['evictions'],
+                    "Memory (MB)": round(stats['bytes'] / 2**20, 1),
+                }
+                for name, stats in cache_stats().items()
+            ],
+            hide_index=True
+        )
+
+
+explorer()
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from CrossFilter import age_bounds, filter_key, filtered_batches, filtered_chunks
+from PageTimings import span
+from ResultCache import LRUCache
+from SurveyCube import BACKEND, appended_count, get_cube
+from SurveyData import dataset_hash
+from SurveySchema import codes, domain
+
+# Ad-hoc crosstabs of any two or three survey columns (CrosstabExplorer page).
+# Counts come straight from the integer codes of the columns: the codes of the selected
+# columns are combined into one flat index and counted with a bincount per chunk of the rows
+# matching the sidebar filters (found with the CrossFilter bitmaps). With a SQL backend the
+# crosstab is a GROUP BY of the filtered cube; in streaming mode one pass over the file.
+# Results are kept in an LRU shared by all sessions, keyed by dataset version, filters and
+# columns, so popular combinations are answered from memory; batches appended since a
+# crosstab was counted are counted on their own and added to it.
+
+# Crosstabs kept in memory, and the memory they may take
+CACHE_SIZE = int(os.environ.get("SURVEY_CROSSTAB_CACHE", "128"))
+CACHE_BYTES = int(os.environ.get("SURVEY_CROSSTAB_CACHE_MB", "64")) * 2**20
+
+NORMALIZATIONS = {"count": "Count", "row": "Row %", "column": "Column %"}
+
+
+def _sizeof(entry):
+    # (counts, appended batches counted)
+    return entry[0].nbytes
+
+
+_cache = LRUCache("crosstabs", CACHE_SIZE, CACHE_BYTES, sizeof=_sizeof)
+
+
+def _count_chunk(chunk, dims, shape):
+    cols = [codes(chunk[d]) for d in dims]
+    present = np.logical_and.reduce([c >= 0 for c in cols])
+    flat = np.ravel_multi_index([c[present] for c in cols], shape)
+    return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def crosstab_counts(dims, filters):
+    # Counts of every combination of dims (dense array shaped by their domains) among the rows matching filters
+    dims = tuple(dims)
+    base = get_cube()
+    key = filter_key(filters, age_bounds(base))
+    digest = dataset_hash()
+    appended = appended_count(digest)
+    shape = tuple(len(domain(d)) for d in dims)
+
+    def compute():
+        # (counts, appended batches counted)
+        with span("crosstab"):
+            if BACKEND != "memory":
+                return (base.where(key) if key else base)._counts(dims), appended
+            counts = np.zeros(shape, dtype=np.int64)
+            for chunk in filtered_chunks(key, appended):
+                counts += _count_chunk(chunk, dims, shape)
+            return counts, appended
+
+    counts, folded = _cache.get((digest, key, dims), compute)
+    if folded < appended:
+        # Counted before the latest appends: only the new batches are added
+        with span("crosstab"):
+            counts = counts.copy()
+            for batch in filtered_batches(digest, key, folded, appended):
+                counts += _count_chunk(batch, dims, shape)
+        _cache.put((digest, key, dims), (counts, appended))
+    return counts
+
+
+def crosstab(dims, filters, normalize="count"):
+    # Long-form crosstab: one row per combination of the answers given, with "Students" and,
+    # for row/column normalization, "Percent" within each value of the first/second column
+    # (and of the third column, when there is one)
+    counts = crosstab_counts(dims, filters)
+    values = counts.astype(float)
+    if normalize != "count":
+        axis = 1 if normalize == "row" else 0
+        totals = counts.sum(axis=axis, keepdims=True)
+        values = 100 * counts / np.maximum(totals, 1)
+
+    # answers nobody gave are left out
+    kept = [
+        np.flatnonzero(counts.sum(axis=tuple(a for a in range(counts.ndim) if a != axis)))
+        for axis in range(counts.ndim)
+    ]
+    grid = np.ix_(*kept)
+    index = pd.MultiIndex.from_product(
+        [[domain(d)[k] for k in positions] for d, positions in zip(dims, kept)], names=list(dims)
+    )
+    frame = pd.DataFrame({"Students": counts[grid].ravel()}, index=index)
+    if normalize != "count":
+        frame["Percent"] = values[grid].ravel()
+    return frame.reset_index()
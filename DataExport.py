@@ -0,0 +1,153 @@
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from CrossFilter import current_filter_key
+from PageTimings import calling_page
+from SurveyCube import data_version, stream_progress
+
+# CSV and Parquet downloads of the data behind the charts.
+# A download button is given a function, so nothing is exported until someone clicks it.
+# The export is then written to EXPORT_DIR chunk by chunk (one frame of rows in memory at a
+# time) and kept there, named by (page and chart, dataset version, sidebar filters, chart
+# state, format): later downloads of the same export, from any session, send the existing
+# file. One thread writes a given export while the others wait for it, and at most
+# EXPORT_WORKERS exports are written at once, so a burst of large exports does not stack
+# up copies in memory while they are built. Sending a file is another matter: each offered
+# export is held in memory whole (see _read).
+# Needs Streamlit 1.52 or later for download buttons that take a function.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+EXPORT_DIR = os.environ.get("SURVEY_EXPORT_DIR", os.path.join(HERE, "exports"))
+
+# Exports written at the same time, and exports kept on disk (least recently used removed first)
+EXPORT_WORKERS = int(os.environ.get("SURVEY_EXPORT_WORKERS", "2"))
+EXPORT_KEEP = int(os.environ.get("SURVEY_EXPORT_KEEP", "200"))
+
+# Seconds an export is safe from pruning after its last use, so a download being sent is never removed
+EXPORT_GRACE = float(os.environ.get("SURVEY_EXPORT_GRACE", "300"))
+
+# format -> (button label, MIME type)
+FORMATS = {
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+
+_slots = threading.BoundedSemaphore(EXPORT_WORKERS)
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _frames(data):
+    # Frames of an export: a function yielding frames (rows of the dataset), or a table
+    # already computed for a chart (its index becomes ordinary columns)
+    if callable(data):
+        return data()
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    if not isinstance(data.index, pd.RangeIndex):
+        data = data.reset_index()
+    names = [" / ".join(map(str, c)) if isinstance(c, tuple) else str(c) for c in data.columns]
+    return [data.set_axis(names, axis=1)]
+
+
+def _write_csv(frames, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        header = True
+        for frame in frames:
+            frame.to_csv(f, index=False, header=header)
+            header = False
+
+
+def _write_parquet(frames, path):
+    # One row group per frame, all cast to the schema of the first
+    writer = None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet}
+
+
+def _prune():
+    # Drop the least recently used exports beyond EXPORT_KEEP, sparing those used in the last EXPORT_GRACE seconds
+    files = [os.path.join(EXPORT_DIR, name) for name in os.listdir(EXPORT_DIR) if not name.endswith(".tmp")]
+    files.sort(key=os.path.getmtime)
+    cutoff = time.time() - EXPORT_GRACE
+    for path in files[:max(len(files) - EXPORT_KEEP, 0)]:
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def export_path(name, data, version, key, state, fmt):
+    # Path of the export of `data` for this dataset version, filter key and state, written on first use
+    tag = hashlib.sha1(repr((version, key, state, fmt)).encode()).hexdigest()[:16]
+    path = os.path.join(EXPORT_DIR, f"{name}-{tag}.{fmt}")
+    with _locks_lock:
+        lock = _locks.setdefault(path, threading.Lock())
+    with lock:
+        if not os.path.exists(path):
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with _slots:
+                try:
+                    _WRITERS[fmt](_frames(data), tmp)
+                    os.replace(tmp, path)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+            _prune()
+        else:
+            # the modification time records the last use (see _prune)
+            os.utime(path)
+    with _locks_lock:
+        _locks.pop(path, None)
+    return path
+
+
+def _read(path):
+    # The whole file. Downloads cannot be streamed from disk: Streamlit turns whatever the
+    # button's function returns (a file object too) into bytes and keeps them in its media
+    # file store, one copy per distinct content, while the download is offered. Serving an
+    # export therefore holds the complete file in memory; EXPORT_KEEP bounds the disk, not this
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def export_buttons(name, data, state=(), label="data"):
+    # CSV and Parquet download buttons for `data`: a table computed for a chart, or a function
+    # yielding the frames of a larger export. `state` holds the chart's other inputs
+    # (selection etc.); the page, data version and sidebar filters are added here. While a
+    # streamed survey is loading the loaded row count is part of the version too, so a
+    # partial table never takes the place of the complete one.
+    name = f"{calling_page()}-{name}"
+    version, key = (data_version(), stream_progress()), current_filter_key()
+    for column, (fmt, (fmt_label, mime)) in zip(st.columns(len(FORMATS)), FORMATS.items()):
+        column.download_button(
+            f"Download {label} ({fmt_label})",
+            lambda fmt=fmt: _read(export_path(name, data, version, key, state, fmt)),
+            file_name=f"{name}.{fmt}",
+            mime=mime,
+            on_click="ignore",
+            key=f"export:{name}:{fmt}",
+            use_container_width=True
+        )
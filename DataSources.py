@@ -0,0 +1,234 @@
+import hashlib
+import os
+import sqlite3
+import urllib.parse
+import urllib.request
+from contextlib import closing
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import SurveySnapshot
+
+# Where the survey comes from.
+# Every source reads one kind of location and answers fetch(validator) with
+# (payload, content hash, validator), or None when the copy identified by `validator`
+# (what the source returned last time) is still current. Payloads are CSV bytes, a
+# CsvFile / SnapshotFile path, or a DataFrame of raw survey columns (database tables).
+# Sources are named by a URI, e.g. in SURVEY_SOURCE:
+#
+#   file:///data/survey.csv  (or a plain path)   local CSV
+#   snapshot:///data/snapshots                   ingested Arrow snapshots (SurveySnapshot.py)
+#   https://host/survey.csv                      HTTP(S), pooled keep-alive connections with retries
+#   objstore://bucket/key.csv                    local object-store stand-in under SURVEY_OBJECT_STORE
+#   sqlite:////data/survey.db?table=responses    table of an embedded SQLite database
+#                                                (sqlite:///survey.db for a relative path)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Remote copy of the dataset on GitHub
+DATA_URL = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-1/refs/heads/main/ONLINE%20EDUCATION%20SYSTEM%20REVIEW.csv"
+
+# Root directory of the object-store stand-in (objects live at <root>/<bucket>/<key>)
+OBJECT_STORE = os.environ.get("SURVEY_OBJECT_STORE", os.path.join(HERE, "object_store"))
+
+# HTTP: attempts after the first, and pooled connections kept per host
+HTTP_RETRIES = int(os.environ.get("SURVEY_HTTP_RETRIES", "3"))
+HTTP_POOL = int(os.environ.get("SURVEY_HTTP_POOL", "4"))
+
+
+class CsvFile(str):
+    # Path of a local CSV that is read in chunks on demand (streaming mode)
+    pass
+
+
+class SnapshotFile(str):
+    # Path of an ingested Arrow snapshot
+    pass
+
+
+def _stat(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DataSource:
+    # Base class: `name` identifies the location, `remote` marks sources worth keeping an
+    # offline copy of (see SurveyData)
+    remote = False
+
+    def __init__(self, name):
+        self.name = name
+
+    def available(self):
+        return True
+
+    def fetch(self, validator=None):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class LocalFileSource(DataSource):
+    # A CSV on the local disk, whole or (streaming) as a path read in chunks
+
+    def __init__(self, path, streaming=False):
+        super().__init__(path)
+        self.path = path
+        self.streaming = streaming
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def fetch(self, validator=None):
+        current = _stat(self.path)
+        if current == validator:
+            return None
+        if self.streaming:
+            return CsvFile(self.path), SurveySnapshot.file_digest(self.path), current
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        return raw, hashlib.sha256(raw).hexdigest(), current
+
+
+class SnapshotSource(DataSource):
+    # The current ingested snapshot of a snapshot directory, memory-mapped when parsed
+
+    def __init__(self, directory):
+        self.pointer = os.path.join(directory, SurveySnapshot.POINTER)
+        super().__init__(self.pointer)
+        self.directory = directory
+
+    def available(self):
+        return os.path.exists(self.pointer)
+
+    def fetch(self, validator=None):
+        current = _stat(self.pointer)
+        if current == validator:
+            return None
+        snapshot = SurveySnapshot.current_snapshot(self.directory)
+        if snapshot is None:
+            raise FileNotFoundError(f"No current snapshot in {self.directory}")
+        digest, path = snapshot
+        return SnapshotFile(path), digest, current
+
+
+class HttpSource(DataSource):
+    # A CSV served over HTTP(S), revalidated with ETag / Last-Modified. One session per
+    # source keeps connections alive between fetches; connection errors and 429/5xx
+    # answers are retried with exponential backoff.
+    remote = True
+
+    def __init__(self, url, timeout=10.0, retries=HTTP_RETRIES, pool=HTTP_POOL):
+        super().__init__(url)
+        self.url = url
+        # (connect, read) timeouts
+        self.timeout = (min(3.05, timeout), timeout)
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, validator=None):
+        headers = {}
+        if validator:
+            etag, last_modified = validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        # requests' errors are OSErrors, like those of the local sources
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        raw = response.content
+        return raw, hashlib.sha256(raw).hexdigest(), (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+
+class ObjectStoreSource(DataSource):
+    # Stand-in for an object store (S3, GCS, ...): objects are files under
+    # <root>/<bucket>/<key>, and the ETag is the MD5 of the content, as for a plain S3 upload.
+    # Treated as remote, so an offline copy is kept.
+    remote = True
+
+    def __init__(self, bucket, key, root=OBJECT_STORE):
+        super().__init__(f"objstore://{bucket}/{key}")
+        self.path = os.path.join(root, bucket, *key.split("/"))
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def fetch(self, validator=None):
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        etag = hashlib.md5(raw).hexdigest()
+        if validator == (etag, None):
+            return None
+        return raw, hashlib.sha256(raw).hexdigest(), (etag, None)
+
+
+def put_object(bucket, key, raw, root=OBJECT_STORE):
+    # Store an object in the stand-in (what an upload would do)
+    path = os.path.join(root, bucket, *key.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, path)
+    return path
+
+
+class SqliteSource(DataSource):
+    # A table of an embedded SQLite database whose columns are the survey's CSV columns
+
+    def __init__(self, path, table="survey"):
+        super().__init__(f"sqlite:///{path}?table={table}")
+        self.path = path
+        self.table = table
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def fetch(self, validator=None):
+        current = _stat(self.path)
+        if current == validator:
+            return None
+        location = urllib.request.pathname2url(os.path.abspath(self.path))
+        with closing(sqlite3.connect(f"file:{location}?mode=ro", uri=True)) as connection:
+            table = self.table.replace('"', '""')
+            frame = pd.read_sql_query(f'SELECT * FROM "{table}"', connection)
+        digest = hashlib.sha256(pd.util.hash_pandas_object(frame, index=False).values.tobytes()).hexdigest()
+        return frame, digest, current
+
+
+def source_from_uri(uri, streaming=False, timeout=10.0):
+    # The DataSource named by a URI (see the top of this file)
+    parts = urllib.parse.urlsplit(uri)
+    scheme = parts.scheme.lower()
+    path = urllib.parse.unquote(parts.path)
+    if scheme in ("http", "https"):
+        return HttpSource(uri, timeout)
+    if scheme == "objstore":
+        return ObjectStoreSource(parts.netloc, path.lstrip("/"))
+    if scheme == "snapshot":
+        return SnapshotSource(path)
+    if scheme == "sqlite":
+        table = urllib.parse.parse_qs(parts.query).get("table", ["survey"])[0]
+        return SqliteSource(path[1:], table)
+    if scheme == "file":
+        return LocalFileSource(path, streaming)
+    if scheme == "" or len(scheme) == 1:
+        # a plain path (or a Windows drive letter)
+        return LocalFileSource(uri, streaming)
+    raise ValueError(f"Unsupported survey source {uri!r}")
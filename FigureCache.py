@@ -0,0 +1,113 @@
+import base64
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from CrossFilter import current_filter_key
+from PageTimings import lap, span
+from ResultCache import LRUCache
+from SurveyCube import data_version, stream_progress
+
+# Figure-level cache of the charts.
+# A page hands show_chart() a function building its figure instead of the figure itself;
+# the figure is then built and serialized once per (page and chart, data version, sidebar
+# filters, chart state such as the selector value) and later reruns, in any session, reuse
+# the stored spec. Numeric lists left in the spec are packed into Plotly's typed-array form
+# ({"dtype", "bdata"}: base64 of the smallest fitting dtype), as Plotly already does for
+# NumPy arrays, so payloads shrink too. Specs are encoded by Plotly's JSON engine, which
+# uses orjson when it is installed.
+
+# Figures kept in memory, and the memory they may take
+CACHE_SIZE = int(os.environ.get("SURVEY_FIGURE_CACHE", "512"))
+CACHE_BYTES = int(os.environ.get("SURVEY_FIGURE_CACHE_MB", "64")) * 2**20
+
+_INT_TYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+
+# Lists shorter than this stay plain JSON (a typed array has a fixed overhead)
+MIN_PACKED = 4
+
+
+def _packed(values):
+    # Typed-array form of a list of numbers, or None when it is not one (or not worth it)
+    if len(values) < MIN_PACKED or not all(
+        isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)) for v in values
+    ):
+        return None
+    array = np.asarray(values)
+    if array.dtype.kind == "f" and np.isfinite(array).all() and (array == np.round(array)).all():
+        array = array.astype(np.int64)
+    if array.dtype.kind in "iu":
+        lo, hi = array.min(), array.max()
+        dtype = next((t for t in _INT_TYPES if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max), None)
+        if dtype is None:
+            return None
+        array = array.astype(dtype)
+    else:
+        array = array.astype(np.float64)
+    return {"dtype": array.dtype.str[1:], "bdata": base64.b64encode(array.tobytes()).decode()}
+
+
+def _compact(value, packable=True):
+    # Trace spec with every eligible numeric list packed (nested lists, e.g. 2-D customdata, are left as they are)
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        packed = _packed(value) if packable else None
+        return packed if packed is not None else [_compact(v, packable=False) for v in value]
+    return value
+
+
+class SerializedFigure(go.Figure):
+    # A figure that is only its stored spec: st.plotly_chart reads the spec with to_dict()
+    # and, since this is a figure object, does not validate it again; encoding the stored
+    # dict is all that is left per rerun
+
+    def __new__(cls, spec, size):
+        fig = object.__new__(cls)
+        object.__setattr__(fig, "_spec", spec)
+        object.__setattr__(fig, "_size", size)
+        return fig
+
+    def __init__(self, spec, size):
+        pass
+
+    def to_dict(self):
+        return self._spec
+
+    def to_plotly_json(self):
+        return self._spec
+
+    def to_json(self, *args, **kwargs):
+        return pio.to_json(self._spec, validate=False)
+
+    def __repr__(self):
+        return f"SerializedFigure({self._size} bytes)"
+
+
+def _serialize(fig):
+    spec = fig.to_dict()
+    spec["data"] = [_compact(trace) for trace in spec["data"]]
+    return SerializedFigure(spec, len(pio.to_json(spec, validate=False)))
+
+
+_cache = LRUCache("figures", CACHE_SIZE, CACHE_BYTES, sizeof=lambda fig: fig._size)
+
+
+def _build(chart, build):
+    # A cache miss: building the figure and serializing it are timed as separate stages
+    fig = build()
+    lap("figure", chart)
+    with span("serialize", chart):
+        return _serialize(fig)
+
+
+def cached_figure(page, chart, build, state=(), filters=True):
+    # The figure build() returns for this chart of a page (chart names are only unique within
+    # their page), data version, filters (unless the chart ignores them) and state, built once
+    if stream_progress() is not None:
+        # a streamed survey still loading: the cube changes between reruns under the same version
+        return build()
+    key = (page, chart, data_version(), current_filter_key() if filters else (), state, pio.templates.default)
+    return _cache.get(key, lambda: _build(chart, build))
@@ -1,8 +1,14 @@
 import streamlit as st
-import plotly.express as px
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.io as pio
+from Assets import show_banner
+from CrossFilter import current_cube, current_filter_key, filtered_chunks
+from ChartData import histogram
+from DataExport import export_buttons
+from PageTimings import lap, show_chart
+
+lap("imports")
 
 # Add a header title
 st.header("Impact of Online Learning During COVID-19")
@@ -14,9 +20,8 @@ st.write(
     """
 )
 
-# Add a banner image at the top
-banner_image = 'https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-1/main/OnlineLearning.jpg' 
-st.image(banner_image, use_container_width=True)
+# Add a banner image at the top (bundled copy, served as responsive WebP variants)
+show_banner()
 
 # Add the extended explanation
 st.write(
@@ -24,127 +29,160 @@ st.write(
     """
 )
 
-# Load CSV from GitHub
-url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-1/refs/heads/main/ONLINE%20EDUCATION%20SYSTEM%20REVIEW.csv"
-
-# Read the dataset
-df = pd.read_csv(url)
+# Precomputed aggregates of the dataset (shared, cached), with the sidebar filters applied
+cube = current_cube()
 
 # Add the subtitle header
 st.subheader("Demographic Overview")
 
+# Every response matching the sidebar filters, exported chunk by chunk on download
+filter_key = current_filter_key()
+export_buttons("responses", lambda: filtered_chunks(filter_key), label="filtered responses")
+
 # Set theme
 pio.templates.default = "plotly_white"
 
 # Blue–Red palette
 colors = ["#1f77b4", "#d62728", "#7f7f7f"]
 
+lap("layout")
+
 # ==============================
 # 1️⃣ Gender Distribution (Pie)
 # ==============================
-gender_counts = df["Gender"].value_counts()
-
-fig = go.Figure(
-    data=[go.Pie(
-        labels=gender_counts.index,
-        values=gender_counts.values,
-        marker_colors=colors[:len(gender_counts)]
-    )]
-)
-
-fig.update_layout(
-    title="1. Gender Distribution",
-    legend_title="Gender"
-)
-
-st.plotly_chart(fig, use_container_width=True)
+gender_counts = cube.value_counts("Gender")
+lap("transform", "gender")
+
+# Figures are built in functions: show_chart builds each one once per data version,
+# filters and selection, and reuses the serialized spec on later reruns
+def gender_figure():
+    fig = go.Figure(
+        data=[go.Pie(
+            labels=gender_counts.index,
+            values=gender_counts.values,
+            marker_colors=colors[:len(gender_counts)]
+        )]
+    )
+
+    fig.update_layout(
+        title="1. Gender Distribution",
+        legend_title="Gender"
+    )
+    return fig
+
+show_chart("gender", gender_figure, use_container_width=True)
+export_buttons("gender", gender_counts)
 
 
 # =======================================
 # 2️⃣ Level of Education Distribution (Bar)
 # =======================================
-edu_counts = df["Level of Education"].value_counts()
-
-fig = go.Figure(
-    data=[go.Bar(
-        x=edu_counts.index,
-        y=edu_counts.values,
-        marker_color=colors[:len(edu_counts)]
-    )]
-)
-
-fig.update_layout(
-    title="2. Level of Education Distribution",
-    legend_title="Education Level",
-    xaxis_title="Education Level",
-    yaxis_title="Count"
-)
-
-st.plotly_chart(fig, use_container_width=True)
+edu_counts = cube.value_counts("Level of Education")
+lap("transform", "education")
+
+def education_figure():
+    fig = go.Figure(
+        data=[go.Bar(
+            x=edu_counts.index,
+            y=edu_counts.values,
+            marker_color=colors[:len(edu_counts)]
+        )]
+    )
+
+    fig.update_layout(
+        title="2. Level of Education Distribution",
+        legend_title="Education Level",
+        xaxis_title="Education Level",
+        yaxis_title="Count"
+    )
+    return fig
+
+show_chart("education", education_figure, use_container_width=True)
+export_buttons("education", edu_counts)
 
 
 # =======================
 # 3️⃣ Age Distribution
 # =======================
-fig = go.Figure(
-    data=[go.Histogram(
-        x=df["Age(Years)"],
-        marker_color=colors[0]
-    )]
+# Bin the age counts on the server (one bin per year) instead of sending every row
+age_counts = cube.counts_for("Age(Years)")
+age_counts = age_counts[age_counts > 0]
+age_hist, age_edges = histogram(
+    age_counts.index, age_counts.values, bins=np.arange(age_counts.index.min(), age_counts.index.max() + 2)
 )
+lap("transform", "age")
 
-fig.update_layout(
-    title="3. Age Distribution",
-    xaxis_title="Age (Years)",
-    yaxis_title="Frequency",
-    bargap=0.2
-)
+def age_figure():
+    fig = go.Figure(
+        data=[go.Bar(
+            x=age_edges[:-1],
+            y=age_hist,
+            marker_color=colors[0]
+        )]
+    )
+
+    fig.update_layout(
+        title="3. Age Distribution",
+        xaxis_title="Age (Years)",
+        yaxis_title="Frequency",
+        bargap=0.2
+    )
+    return fig
 
-st.plotly_chart(fig, use_container_width=True)
+show_chart("age", age_figure, use_container_width=True)
+export_buttons("age", age_counts)
 
 
 # ================================
 # 4️⃣ Home Location Distribution
 # ================================
-home_counts = df["Home Location"].value_counts()
-
-fig = go.Figure(
-    data=[go.Bar(
-        x=home_counts.index,
-        y=home_counts.values,
-        marker_color=colors[:len(home_counts)]
-    )]
-)
+home_counts = cube.value_counts("Home Location")
+lap("transform", "home_location")
 
-fig.update_layout(
-    title="4. Home Location Distribution",
-    xaxis_title="Home Location",
-    yaxis_title="Count"
-)
+def home_location_figure():
+    fig = go.Figure(
+        data=[go.Bar(
+            x=home_counts.index,
+            y=home_counts.values,
+            marker_color=colors[:len(home_counts)]
+        )]
+    )
 
-st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(
+        title="4. Home Location Distribution",
+        xaxis_title="Home Location",
+        yaxis_title="Count"
+    )
+    return fig
+
+show_chart("home_location", home_location_figure, use_container_width=True)
+export_buttons("home_location", home_counts)
 
 
 # =========================
 # 5️⃣ Economic Status (Donut)
 # =========================
-econ_counts = df["Economic status"].value_counts()
-
-fig = go.Figure(
-    data=[go.Pie(
-        labels=econ_counts.index,
-        values=econ_counts.values,
-        hole=0.4,
-        marker_colors=colors[:len(econ_counts)]
-    )]
-)
-
-fig.update_layout(
-    title="5. Economic Status Distribution",
-    legend_title="Economic Class"
-)
-
-st.plotly_chart(fig, use_container_width=True)
+econ_counts = cube.value_counts("Economic status")
+lap("transform", "economic_status")
+
+def economic_status_figure():
+    fig = go.Figure(
+        data=[go.Pie(
+            labels=econ_counts.index,
+            values=econ_counts.values,
+            hole=0.4,
+            marker_colors=colors[:len(econ_counts)]
+        )]
+    )
+
+    fig.update_layout(
+        title="5. Economic Status Distribution",
+        legend_title="Economic Class"
+    )
+    return fig
+
+show_chart("economic_status", economic_status_figure, use_container_width=True)
+export_buttons("economic_status", econ_counts)
 
 
 
@@ -0,0 +1,293 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+# Concurrent-session load test of the multipage app.
+# Starts `streamlit run Assignment1.py` on a local port (reading the bundled CSV, fully
+# offline) and drives N simulated browser sessions over Streamlit's websocket protocol.
+# Every session repeatedly opens each page, steps through the education selector on
+# PerformanceImpact and sets/clears a sidebar filter, timing every rerun from the request
+# until the server reports the script finished. The report gives p50/p95/p99 rerun latency
+# (overall and per action), throughput, and the server's memory growth per session;
+# thresholds turn it into a pass/fail check.
+#
+#   python LoadTest.py --sessions 200 --duration 60
+#   python LoadTest.py --sessions 50 --iterations 2 --max-p95-ms 1500 --max-session-mb 2
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+APP = os.path.join(HERE, "Assignment1.py")
+
+SELECTOR_PAGE = "PerformanceImpact"
+FILTER_LABEL = "Gender"
+
+_FINISHED = ForwardMsg.ScriptFinishedStatus
+_DONE = (_FINISHED.FINISHED_SUCCESSFULLY, _FINISHED.FINISHED_FRAGMENT_RUN_SUCCESSFULLY, _FINISHED.FINISHED_WITH_COMPILE_ERROR)
+_WIDGETS = ("selectbox", "multiselect")
+
+
+def start_server(port, env=None):
+    # `streamlit run Assignment1.py` in a subprocess, returned once its health check answers
+    command = [
+        sys.executable, "-m", "streamlit", "run", APP,
+        "--server.headless", "true",
+        "--server.port", str(port),
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+    ]
+    server = subprocess.Popen(command, cwd=HERE, env={**os.environ, **(env or {})},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("streamlit exited during startup")
+            time.sleep(0.25)
+    server.kill()
+    raise RuntimeError("streamlit did not become healthy within 60s")
+
+
+def rss_bytes(pid):
+    # Resident memory of a process (Linux /proc)
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class Session:
+    # One simulated browser tab speaking Streamlit's websocket protocol
+
+    def __init__(self, url, results):
+        self.url = url
+        self.results = results      # list of (action, seconds, ok) shared by all sessions
+        self.pages = {}             # url path -> page script hash
+        self.widgets = {}           # label -> (kind, widget id, options, fragment id)
+        self.states = {}            # widget id -> WidgetState sent with every rerun
+        self.page_hash = ""
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def rerun(self, action, fragment_id=""):
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.query_string = ""
+        client.page_script_hash = self.page_hash
+        client.fragment_id = fragment_id
+        client.widget_states.widgets.extend(self.states.values())
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        ok = True
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {p.url_pathname: p.page_script_hash for p in forward.navigation.app_pages}
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    ok = False
+                elif element_kind in _WIDGETS:
+                    widget = getattr(element, element_kind)
+                    self.widgets[widget.label] = (element_kind, widget.id, list(widget.options), forward.delta.fragment_id)
+            elif kind == "script_finished" and forward.script_finished in _DONE:
+                ok = ok and forward.script_finished != _FINISHED.FINISHED_WITH_COMPILE_ERROR
+                break
+        self.results.append((action, time.perf_counter() - start, ok))
+
+    async def open_page(self, path):
+        self.page_hash = self.pages.get(path, "")
+        await self.rerun(f"open {path or 'Homepage'}")
+
+    async def select(self, label, value):
+        # Change a selectbox (string) or multiselect (list) the way the browser does
+        kind, widget_id, _, fragment_id = self.widgets[label]
+        state = self.states.get(widget_id) or self._state(widget_id)
+        if kind == "selectbox":
+            state.string_value = value
+        else:
+            del state.string_array_value.data[:]
+            state.string_array_value.data.extend(value)
+        await self.rerun(f"{kind} {label}", fragment_id)
+
+    def _state(self, widget_id):
+        msg = BackMsg()
+        state = msg.rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        self.states[widget_id] = state
+        return state
+
+    async def iteration(self):
+        # One pass of the scenario: every page, every selector option, one filter on and off
+        await self.open_page("")
+        for path in [p for p in self.pages if p]:
+            await self.open_page(path)
+            if path == SELECTOR_PAGE:
+                selector = next((w for w in self.widgets.values() if w[0] == "selectbox"), None)
+                if selector:
+                    label = next(l for l, w in self.widgets.items() if w is selector)
+                    for option in selector[2][1:] + selector[2][:1]:
+                        await self.select(label, option)
+        if FILTER_LABEL in self.widgets:
+            await self.select(FILTER_LABEL, self.widgets[FILTER_LABEL][2][:1])
+            await self.select(FILTER_LABEL, [])
+
+
+async def _run_session(url, results, deadline, iterations, delay):
+    await asyncio.sleep(delay)
+    async with Session(url, results) as session:
+        await session.rerun("connect")
+        done = 0
+        while (iterations and done < iterations) or (not iterations and time.monotonic() < deadline):
+            await session.iteration()
+            done += 1
+
+
+async def _drive(url, sessions, duration, iterations, ramp, pid, memory):
+    results = []
+    deadline = time.monotonic() + ramp + duration
+    sampling = True
+
+    async def sample():
+        while sampling:
+            memory.append(rss_bytes(pid))
+            await asyncio.sleep(0.5)
+
+    sampler = asyncio.create_task(sample())
+    tasks = [
+        _run_session(url, results, deadline, iterations, ramp * i / max(sessions, 1))
+        for i in range(sessions)
+    ]
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    sampling = False
+    await sampler
+    errors = [o for o in outcomes if isinstance(o, Exception)]
+    return results, errors
+
+
+def _percentiles(seconds):
+    p50, p95, p99 = np.percentile(np.array(seconds) * 1000, [50, 95, 99])
+    return {"count": len(seconds), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1)}
+
+
+def run(sessions, duration, iterations=None, ramp=5.0, port=8599):
+    # Start the app, run the sessions and return the report
+    server = start_server(port)
+    try:
+        url = f"ws://localhost:{port}/_stcore/stream"
+        # one warm-up pass so the report measures steady state, not the first data load
+        asyncio.run(_drive(url, 1, 0, 1, 0, server.pid, []))
+        baseline = rss_bytes(server.pid)
+
+        memory = [baseline]
+        start = time.perf_counter()
+        results, errors = asyncio.run(_drive(url, sessions, duration, iterations, ramp, server.pid, memory))
+        elapsed = time.perf_counter() - start
+        final = rss_bytes(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    timed = [r for r in results if r[0] != "connect"]
+    report = {
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "reruns": len(timed),
+        "throughput_per_s": round(len(timed) / elapsed, 2) if elapsed else 0.0,
+        "failed_reruns": sum(1 for r in timed if not r[2]),
+        "session_errors": [repr(e) for e in errors[:5]],
+        "latency": _percentiles([r[1] for r in timed]) if timed else None,
+        "by_action": {
+            action: _percentiles([r[1] for r in timed if r[0] == action])
+            for action in sorted({r[0] for r in timed})
+        },
+        "memory": {
+            "baseline_mb": round(baseline / 2**20, 1),
+            "peak_mb": round(max(memory) / 2**20, 1),
+            "final_mb": round(final / 2**20, 1),
+            "per_session_mb": round((max(memory) - baseline) / 2**20 / max(sessions, 1), 3),
+        },
+    }
+    return report
+
+
+def check(report, max_p50=None, max_p95=None, max_p99=None, min_throughput=None, max_session_mb=None):
+    # Threshold violations of a report, as readable lines
+    failures = []
+    latency = report["latency"] or {}
+    for name, limit in (("p50_ms", max_p50), ("p95_ms", max_p95), ("p99_ms", max_p99)):
+        if limit is not None and latency.get(name, 0) > limit:
+            failures.append(f"{name} {latency[name]} > {limit}")
+    if min_throughput is not None and report["throughput_per_s"] < min_throughput:
+        failures.append(f"throughput {report['throughput_per_s']}/s < {min_throughput}/s")
+    if max_session_mb is not None and report["memory"]["per_session_mb"] > max_session_mb:
+        failures.append(f"memory per session {report['memory']['per_session_mb']} MB > {max_session_mb} MB")
+    if report["failed_reruns"] or report["session_errors"]:
+        failures.append(f"{report['failed_reruns']} failed reruns, {len(report['session_errors'])} session errors")
+    return failures
+
+
+def _print_report(report):
+    latency = report["latency"] or {}
+    print(f"{report['sessions']} sessions, {report['reruns']} reruns in {report['seconds']}s "
+          f"= {report['throughput_per_s']} reruns/s")
+    print(f"rerun latency  p50={latency.get('p50_ms')}ms  p95={latency.get('p95_ms')}ms  p99={latency.get('p99_ms')}ms")
+    for action, stats in report["by_action"].items():
+        print(f"  {action:40} n={stats['count']:6}  p50={stats['p50_ms']:8.1f}ms  "
+              f"p95={stats['p95_ms']:8.1f}ms  p99={stats['p99_ms']:8.1f}ms")
+    memory = report["memory"]
+    print(f"server memory  baseline={memory['baseline_mb']}MB  peak={memory['peak_mb']}MB  "
+          f"final={memory['final_mb']}MB  per session={memory['per_session_mb']}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the dashboard.")
+    parser.add_argument("--sessions", type=int, default=50, help="simulated concurrent sessions")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to keep every session busy")
+    parser.add_argument("--iterations", type=int, help="scenario passes per session (instead of --duration)")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which the sessions connect")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    parser.add_argument("--max-p50-ms", type=float)
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--min-throughput", type=float, help="minimum reruns per second")
+    parser.add_argument("--max-session-mb", type=float, help="maximum server memory growth per session")
+    args = parser.parse_args(argv)
+
+    report = run(args.sessions, args.duration, args.iterations, args.ramp, args.port)
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = check(report, args.max_p50_ms, args.max_p95_ms, args.max_p99_ms, args.min_throughput, args.max_session_mb)
+    for line in failures:
+        print("FAIL", line)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
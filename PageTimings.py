@@ -0,0 +1,155 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+# Lightweight stage timings for page reruns.
+# Assignment1.py opens a run around every page; inside it the data layer records spans
+# (fetch, parse, cube) and the page scripts mark their own stages with lap() and
+# show_chart(). Every page's first lap, "imports", is the time spent importing its
+# modules. With timings off (the default) every call returns straight away.
+#
+# Turn timings on with SURVEY_TIMINGS=1 or by opening the app with ?debug=1; the current
+# run's stages then show in a sidebar panel. With SURVEY_TIMINGS_LOG=<path> each run is
+# also appended to that file as one JSON line, for aggregation across sessions.
+
+ENABLED = os.environ.get("SURVEY_TIMINGS", "") not in ("", "0")
+LOG_PATH = os.environ.get("SURVEY_TIMINGS_LOG")
+
+_current = contextvars.ContextVar("page_timings_run", default=None)
+_log_lock = threading.Lock()
+
+
+class _Run:
+    def __init__(self, page):
+        self.page = page
+        self.started = self.last = time.perf_counter()
+        self.spans = []
+
+    def add(self, stage, chart, seconds, payload_bytes=None):
+        self.spans.append({
+            "stage": stage,
+            "chart": chart,
+            "ms": round(seconds * 1000, 3),
+            "bytes": payload_bytes,
+        })
+
+
+class _Span:
+    def __init__(self, run, stage, chart):
+        self.run, self.stage, self.chart = run, stage, chart
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.run.add(self.stage, self.chart, end - self.start)
+        self.run.last = end
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _requested():
+    if ENABLED:
+        return True
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def begin_page(page):
+    # Start timing a page run (no-op unless timings are requested)
+    _current.set(_Run(page) if _requested() else None)
+
+
+def span(stage, chart=None):
+    # Context manager timing one stage of the current run
+    run = _current.get()
+    return _Span(run, stage, chart) if run is not None else _NO_SPAN
+
+
+def lap(stage, chart=None):
+    # Record the time since the previous lap/span as one stage of the current run
+    run = _current.get()
+    if run is None:
+        return
+    now = time.perf_counter()
+    run.add(stage, chart, now - run.last)
+    run.last = now
+
+
+def calling_page(depth=1):
+    # Name of the page script that called the function `depth` frames up ("Homepage" for a
+    # call made in Homepage.py); chart names are only unique within their page
+    path = sys._getframe(depth + 1).f_globals.get("__file__", "")
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def show_chart(chart, fig, state=(), filters=True, **kwargs):
+    # st.plotly_chart(fig, **kwargs), timed as the chart's "serialize" stage with its payload size.
+    # `fig` may be a function building the figure: it is then built and serialized once per
+    # page, data version, filters and `state` (the chart's other inputs) and reused (FigureCache).
+    # filters=False marks a chart the sidebar filters do not change, so one figure serves them all
+    if callable(fig):
+        from FigureCache import cached_figure
+
+        fig = cached_figure(calling_page(), chart, fig, state, filters)
+    run = _current.get()
+    if run is None:
+        return st.plotly_chart(fig, **kwargs)
+    lap("figure", chart)
+    start = time.perf_counter()
+    result = st.plotly_chart(fig, **kwargs)
+    end = time.perf_counter()
+    run.add("serialize", chart, end - start, len(fig.to_json()))
+    run.last = time.perf_counter()
+    return result
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+def end_page():
+    # Close the current run: show the debug panel and append the run to the JSON lines log
+    run = _current.get()
+    if run is None:
+        return
+    _current.set(None)
+    total = time.perf_counter() - run.started
+
+    with st.sidebar.expander("Debug: page timings", expanded=True):
+        st.caption(f"{run.page}: {total * 1000:.1f} ms in total")
+        st.dataframe(run.spans, hide_index=True)
+
+    if LOG_PATH:
+        record = {
+            "time": time.time(),
+            "session": _session_id(),
+            "page": run.page,
+            "total_ms": round(total * 1000, 3),
+            "spans": run.spans,
+        }
+        with _log_lock, open(LOG_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
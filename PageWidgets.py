@@ -0,0 +1,16 @@
+import streamlit as st
+
+# Widgets that rerun only their own part of a page.
+# The page passes a function drawing everything that depends on the widget; when the
+# user changes the selection Streamlit reruns just that fragment and keeps the rest of
+# the page (headers, other charts) from the previous run.
+
+
+def selector_fragment(label, options, render, key=None, **selectbox_kwargs):
+    # st.selectbox(label, options) followed by render(selection), rerun as one fragment
+    @st.fragment
+    def _fragment():
+        selection = st.selectbox(label, options, key=key, **selectbox_kwargs)
+        render(selection)
+
+    _fragment()
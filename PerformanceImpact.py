@@ -2,7 +2,13 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from CrossFilter import current_cube, current_filter_key, filtered_chunks
+from DataExport import export_buttons
+from PageWidgets import selector_fragment
+from PageTimings import lap, show_chart
+from SurveyStats import describe_chi_square, difference, format_p, interval
+
+lap("imports")
 
 st.header("Analysis of the Impact of Online Learning on Student Performance During COVID-19")
 
@@ -12,11 +18,8 @@ st.write(
     """
 )
 
-# Load CSV from GitHub
-url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-1/refs/heads/main/ONLINE%20EDUCATION%20SYSTEM%20REVIEW.csv"
-
-# Read the dataset
-df = pd.read_csv(url)
+# Precomputed aggregates of the dataset (shared, cached), with the sidebar filters applied
+cube = current_cube()
 
 col1, col2, col3 = st.columns(3)
 
@@ -45,49 +48,61 @@ col3.metric(
 #add subheader
 st.subheader("Does students’ performance get affected during online learning?")
 
-# Mapping traditional marks to 1–10 scale
-traditional_mapping = {
-    '1-10': 1, '11-20': 2, '21-30': 3, '31-40': 4, '41-50': 5,
-    '51-60': 6, '61-70': 7, '71-80': 8, '81-90': 9, '91-100': 10
-}
-df['Traditional_Score'] = df['Average marks scored before pandemic in traditional classroom'].map(traditional_mapping)
-
-# Dropdown to select Level of Education
-education_option = st.selectbox(
-    "Select Level of Education",
-    df['Level of Education'].unique()
-)
+lap("layout")
+
+# Sidebar filters of this session, for the response exports
+filter_key = current_filter_key()
+
+# Education levels, most common first
+education_levels = cube.value_counts('Level of Education').index
+
+# Draw the before/during chart for one education level
+def render_performance_chart(education_option):
+    # Count frequency of each score (before vs after) for the selected level;
+    # traditional marks are mapped to the 1–10 scale once per dataset (Traditional_Score)
+    before_counts = cube.counts_for('Level of Education', 'Traditional_Score').loc[education_option]
+    after_counts = cube.counts_for('Level of Education', 'Performance in online').loc[education_option]
+
+    # Combine into a DataFrame
+    compare_df = pd.DataFrame({
+        'Score': range(1, 11),
+        'Before COVID-19': before_counts.reindex(range(1, 11), fill_value=0),
+        'During COVID-19': after_counts.reindex(range(1, 11), fill_value=0)
+    })
+
+    # Melt for line chart
+    compare_melted = compare_df.melt(id_vars='Score', value_vars=['Before COVID-19','During COVID-19'], 
+                                     var_name='Period', value_name='Number of Students')
+
+    lap("transform", "performance_by_level")
+
+    # Built once per education level (and data version, filters); later reruns reuse it
+    def performance_by_level_figure():
+        # Create line chart
+        fig = px.line(
+            compare_melted,
+            x='Score',
+            y='Number of Students',
+            color='Period',
+            markers=True,
+            title=f'Student Performance: {education_option} Level',
+            labels={'Score':'Performance Score'}
+        )
+        return fig
 
-# Filter dataframe based on selection
-df_filtered = df[df['Level of Education'] == education_option]
-
-# Count frequency of each score (before vs after)
-before_counts = df_filtered['Traditional_Score'].value_counts().sort_index()
-after_counts = df_filtered['Performance in online'].value_counts().sort_index()
-
-# Combine into a DataFrame
-compare_df = pd.DataFrame({
-    'Score': range(1, 11),
-    'Before COVID-19': before_counts.reindex(range(1, 11), fill_value=0),
-    'During COVID-19': after_counts.reindex(range(1, 11), fill_value=0)
-})
-
-# Melt for line chart
-compare_melted = compare_df.melt(id_vars='Score', value_vars=['Before COVID-19','During COVID-19'], 
-                                 var_name='Period', value_name='Number of Students')
-
-# Create line chart
-fig = px.line(
-    compare_melted,
-    x='Score',
-    y='Number of Students',
-    color='Period',
-    markers=True,
-    title=f'Student Performance: {education_option} Level',
-    labels={'Score':'Performance Score'}
-)
+    show_chart("performance_by_level", performance_by_level_figure, state=(education_option,))
+    export_buttons("performance_by_level", compare_df, state=(education_option,), label="chart data")
+
+    # Responses of this education level matching the sidebar filters, exported chunk by chunk
+    def level_responses():
+        for chunk in filtered_chunks(filter_key):
+            yield chunk[chunk['Level of Education'] == education_option]
 
-st.plotly_chart(fig)
+    export_buttons("responses_by_level", level_responses, state=(education_option,), label="responses")
+
+
+# Dropdown to select Level of Education; only its chart reruns when the selection changes
+selector_fragment("Select Level of Education", education_levels, render_performance_chart)
 
 st.write(
     """
@@ -105,31 +120,70 @@ Overall, these findings support the conclusion that online learning negatively i
 #add subheader
 st.subheader("Does having someone monitoring you can lead to better education performance?")
 
-fig = px.histogram(
-    df,
-    x='Performance in online',
-    color='Do elderly people monitor you?',
-    barmode='group',        # side-by-side bars instead of overlay
-    histnorm='percent',     # show percentage instead of raw count
-    opacity=0.8,            # bars are opaque enough to differentiate
-    color_discrete_map={
-        'Yes': '#1f77b4',  # Blue for supervised
-        'No': '#d62728'    # Red for not supervised
-    },
-    title='Performance Distribution by Elderly Supervision',
-    labels={'Performance in online':'Online Performance Score', 
-            'Do elderly people monitor you?':'Elderly Supervision'}
-)
+# Percentage of each supervision group at every score, binned on the server
+supervision_counts = cube.counts_for('Performance in online', 'Do elderly people monitor you?').reset_index()
+supervision_counts = supervision_counts[supervision_counts['count'] > 0]
+supervision_counts['percent'] = 100 * supervision_counts['count'] / supervision_counts.groupby(
+    'Do elderly people monitor you?'
+)['count'].transform('sum')
+
+# 95% bootstrap interval of every percentage, resampled from the score counts of each group
+supervision_table = cube.crosstab('Performance in online', 'Do elderly people monitor you?')
+scores = supervision_table.index.to_numpy()
+errors = {}
+for group, counts in supervision_table.items():
+    share, low, high = interval(scores, counts.to_numpy(), 'proportion')
+    for score, value, lo, hi in zip(scores, share, low, high):
+        errors[(score, group)] = (100 * (hi - value), 100 * (value - lo))
+pairs = zip(supervision_counts['Performance in online'], supervision_counts['Do elderly people monitor you?'])
+supervision_counts[['error_plus', 'error_minus']] = [errors[pair] for pair in pairs]
+
+lap("transform", "supervision")
+
+def supervision_figure():
+    fig = px.bar(
+        supervision_counts,
+        x='Performance in online',
+        y='percent',
+        color='Do elderly people monitor you?',
+        barmode='group',        # side-by-side bars instead of overlay
+        opacity=0.8,            # bars are opaque enough to differentiate
+        color_discrete_map={
+            'Yes': '#1f77b4',  # Blue for supervised
+            'No': '#d62728'    # Red for not supervised
+        },
+        category_orders={'Do elderly people monitor you?': ['Yes', 'No']},
+        error_y='error_plus',
+        error_y_minus='error_minus',
+        title='Performance Distribution by Elderly Supervision',
+        labels={'Performance in online':'Online Performance Score', 
+                'Do elderly people monitor you?':'Elderly Supervision'}
+    )
 
-fig.update_layout(
-    width=800,
-    height=500,
-    xaxis=dict(dtick=1),    # show all integer score values
-    yaxis_title="Percentage of Students",
-    bargap=0.2              # space between grouped bars
-)
+    fig.update_layout(
+        width=800,
+        height=500,
+        xaxis=dict(dtick=1),    # show all integer score values
+        yaxis_title="Percentage of Students",
+        bargap=0.2              # space between grouped bars
+    )
+    return fig
 
-st.plotly_chart(fig)
+show_chart("supervision", supervision_figure)
+export_buttons("supervision", supervision_counts)
+
+# Supervised minus unsupervised share at the score most common among supervised students
+caption = f"Error bars: 95% bootstrap confidence intervals. {describe_chi_square(supervision_table)}."
+if {'Yes', 'No'} <= set(supervision_table.columns):
+    gaps, lows, highs, ps = difference(
+        scores, supervision_table['Yes'].to_numpy(), supervision_table['No'].to_numpy(), 'proportion'
+    )
+    i = supervision_table['Yes'].to_numpy().argmax()
+    caption += (
+        f" Gap at score {scores[i]}: {100 * gaps[i]:+.1f} percentage points"
+        f" (95% CI {100 * lows[i]:+.1f} to {100 * highs[i]:+.1f}, bootstrap {format_p(ps[i])})."
+    )
+st.caption(caption)
 
 st.write(
     """
@@ -141,52 +195,55 @@ st.write(
 #add subheader
 st.subheader("Does studying more lead to better academic performance?")
 
-# Create figure
-fig = go.Figure()
-
-# Add traces for each education level
-education_levels = df['Level of Education'].unique()
-
-for i, level in enumerate(education_levels):
-    subset = df[df['Level of Education'] == level]
-
-    # Calculate average study time by performance level
-    avg_study = subset.groupby('Performance in online')['Study time (Hours)'].mean().reset_index()
-
-    fig.add_trace(
-        go.Bar(
-            x=avg_study['Performance in online'],
-            y=avg_study['Study time (Hours)'],
-            name=level,
-            visible=True if i == 0 else False,  # Only first one visible initially
-            hovertemplate='<b>%{x}</b><br>Avg Study Time: %{y:.1f} hrs<extra></extra>',
-            text=[f"{val:.1f}h" for val in avg_study['Study time (Hours)']],
-            textposition='auto'
+# Average study time by performance level for every education level
+study_means = cube.mean('Study time (Hours)', 'Level of Education', 'Performance in online')
+
+lap("transform", "study_time")
+
+def study_time_figure():
+    # Create figure
+    fig = go.Figure()
+
+    # Add traces for each education level
+    for i, level in enumerate(education_levels):
+        avg_study = study_means.loc[level].reset_index()
+
+        fig.add_trace(
+            go.Bar(
+                x=avg_study['Performance in online'],
+                y=avg_study['Study time (Hours)'],
+                name=level,
+                visible=True if i == 0 else False,  # Only first one visible initially
+                hovertemplate='<b>%{x}</b><br>Avg Study Time: %{y:.1f} hrs<extra></extra>',
+                text=[f"{val:.1f}h" for val in avg_study['Study time (Hours)']],
+                textposition='auto'
+            )
         )
-    )
 
-# Create buttons for dropdown
-buttons = []
-for i, level in enumerate(education_levels):
-    buttons.append(
-        dict(
-            label=level,
-            method="update",
-            args=[{"visible": [j == i for j in range(len(education_levels))]},
-                  {"title": f"Average Study Time by Performance: {level}"}]
+    # Create buttons for dropdown
+    buttons = []
+    for i, level in enumerate(education_levels):
+        buttons.append(
+            dict(
+                label=level,
+                method="update",
+                args=[{"visible": [j == i for j in range(len(education_levels))]},
+                      {"title": f"Average Study Time by Performance: {level}"}]
+            )
         )
-    )
 
-fig.update_layout(
-    title="Average Study Time by Performance: Select Education Level",
-    xaxis_title="Performance in Online",
-    yaxis_title="Average Study Time (Hours)",
-    height=500,
-    width=800,
-    updatemenus=[dict(buttons=buttons, direction="down", x=0.1, y=1.15)]
-)
+    fig.update_layout(
+        title="Average Study Time by Performance: Select Education Level",
+        xaxis_title="Performance in Online",
+        yaxis_title="Average Study Time (Hours)",
+        height=500,
+        width=800,
+        updatemenus=[dict(buttons=buttons, direction="down", x=0.1, y=1.15)]
+    )
+    return fig
 
-st.plotly_chart(fig)
+show_chart("study_time", study_time_figure)
+export_buttons("study_time", study_means)
 
 st.write(
     """
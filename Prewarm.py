@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import runpy
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+import SurveyData
+from Assets import banner_variants
+from CrossFilter import age_bounds, warm_filter_index
+from SurveyCube import BACKEND, get_cube
+
+# Cache pre-warming at server start.
+# A background thread loads the dataset, builds the derived columns, the cube, the
+# filter bitmaps and the banner variants, then runs every page script once in bare mode
+# (no browser session, the default selector state). That imports Plotly and fills the
+# figure cache, so the first visitor hits warm caches. Serve.py starts it before the
+# server accepts connections; Assignment1.py also starts it (once per process) for plain
+# `streamlit run`. Since it imports the modules of every page, the pages' lazy imports
+# only pay off with warming turned off (SURVEY_PREWARM=0).
+#
+# With SURVEY_READY_PORT set, a small HTTP endpoint reports the progress for load balancers:
+#   GET /ready     200 once warming has finished, 503 before
+#   GET /progress  {"state", "step", "done", "total", "seconds", "error"} as JSON
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = ["Homepage.py", "StudentSatisfaction.py", "PerformanceImpact.py", "StudentChallenge.py", "AssociationMatrix.py", "CrosstabExplorer.py"]
+
+# SURVEY_PREWARM=0 turns warming off (e.g. for benchmarks that measure cold renders)
+ENABLED = os.environ.get("SURVEY_PREWARM", "1") not in ("", "0")
+
+# Port of the readiness endpoint (unset = no endpoint)
+READY_PORT = os.environ.get("SURVEY_READY_PORT")
+
+THREAD_NAME = "survey-prewarm"
+
+# Loggers that complain about Streamlit calls made outside a browser session
+_BARE_MODE_LOGGERS = [
+    "streamlit.runtime.scriptrunner_utils.script_run_context",
+    "streamlit.runtime.state.session_state_proxy",
+    "streamlit.deprecation_util",
+]
+
+
+class _SkipWarmupThread(logging.Filter):
+    # Drops the bare-mode warnings of the warm-up thread; other threads log as usual
+    def filter(self, record):
+        return record.threadName != THREAD_NAME
+
+_lock = threading.Lock()
+_status = {"state": "idle", "step": None, "done": 0, "total": 0, "seconds": None, "error": None}
+
+
+def status():
+    # Copy of the warm-up progress
+    with _lock:
+        return dict(_status)
+
+
+def ready():
+    return status()["state"] == "ready"
+
+
+def _page(path):
+    def run():
+        runpy.run_path(os.path.join(HERE, path), run_name="__prewarm__")
+    return run
+
+
+def _steps():
+    return [
+        ("dataset", SurveyData.load_survey_with_hash if BACKEND == "memory" and not SurveyData.STREAMING else SurveyData.dataset_hash),
+        ("cube", get_cube),
+        ("filters", lambda: age_bounds(get_cube())),
+        ("bitmaps", warm_filter_index),
+        ("assets", banner_variants),
+    ] + [(f"page {path}", _page(path)) for path in PAGES]
+
+
+def warm():
+    # Run every warm-up step in order, recording progress; a failed step marks the warm-up failed
+    steps = _steps()
+    start = time.perf_counter()
+    with _lock:
+        _status.update(state="warming", done=0, total=len(steps), error=None)
+
+    try:
+        for name, step in steps:
+            with _lock:
+                _status["step"] = name
+            step()
+            with _lock:
+                _status["done"] += 1
+    except Exception as e:
+        with _lock:
+            _status.update(state="failed", error=f"{type(e).__name__}: {e}")
+        return
+    finally:
+        with _lock:
+            _status["seconds"] = round(time.perf_counter() - start, 3)
+    with _lock:
+        _status.update(state="ready", step=None)
+
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        current = status()
+        if self.path.startswith("/ready"):
+            code, body = (200 if current["state"] == "ready" else 503), current["state"]
+        elif self.path.startswith("/progress"):
+            code, body = 200, json.dumps(current)
+        else:
+            code, body = 404, "not found"
+        payload = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json" if body.startswith("{") else "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_readiness(port):
+    # Readiness/progress endpoint on its own port, in a daemon thread
+    server = ThreadingHTTPServer(("", int(port)), _ReadinessHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="survey-readiness").start()
+    return server
+
+
+@st.cache_resource(show_spinner=False)
+def start_prewarm(ready_port=READY_PORT):
+    # Start warming (and the readiness endpoint, if configured) once per process
+    if ready_port:
+        try:
+            serve_readiness(ready_port)
+        except OSError:
+            # already served by this host's launcher (Serve.py) or another replica
+            pass
+    for name in _BARE_MODE_LOGGERS:
+        logging.getLogger(name).addFilter(_SkipWarmupThread())
+    if not ENABLED:
+        with _lock:
+            _status["state"] = "ready"
+        return None
+    thread = threading.Thread(target=warm, daemon=True, name=THREAD_NAME)
+    thread.start()
+    return thread
@@ -0,0 +1,95 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Size-bounded LRU caches of computed results, shared by all sessions of the process.
+# Each cache is bounded by a number of entries and, optionally, by the bytes its values
+# take; the least recently used entries are evicted first. Every cache counts its hits,
+# misses and evictions, and cache_stats() reports them for all caches by name.
+
+
+def _nbytes(value):
+    # Approximate memory held by a cached value
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+
+    def __init__(self, name, max_entries, max_bytes=0, sizeof=_nbytes):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes      # 0 = bounded by entries only
+        self.sizeof = sizeof
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        _caches[name] = self
+
+    def get(self, key, compute):
+        # The cached value of key, computing and storing it on a miss
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # computed outside the lock: concurrent misses of one key may both compute it
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        # Store (or replace) the value of key
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+
+_caches = {}
+
+
+def cache_stats():
+    # {cache name: stats} of every cache of the process
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches():
+    # Empty every cache of the process (statistics are kept)
+    for cache in _caches.values():
+        cache.clear()
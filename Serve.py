@@ -0,0 +1,24 @@
+import os
+import sys
+
+from streamlit.web import cli
+
+from Prewarm import start_prewarm
+
+# Launcher that warms the caches while the server starts, so the first visitor after a
+# deploy or restart does not pay for loading the data and building the first figures.
+# Arguments are passed on to `streamlit run`:
+#
+#   SURVEY_READY_PORT=8502 python Serve.py --server.port 8501
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None):
+    start_prewarm()
+    sys.argv = ["streamlit", "run", os.path.join(HERE, "Assignment1.py")] + list(sys.argv[1:] if argv is None else argv)
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
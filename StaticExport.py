@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+import sys
+import time
+
+import plotly
+from streamlit.testing.v1 import AppTest
+
+import SurveyData
+
+# Static, pre-rendered copy of the dashboard for serving from a file server or CDN.
+# Every page is rendered headlessly (Streamlit's app-testing harness, unfiltered), once per
+# option of each selector on it, and every Plotly figure is written as JSON. One HTML page
+# per dashboard page shows the figures with plotly.js (bundled, no CDN needed) and switches
+# selector states client-side. Figures are content-addressed, so a chart that does not
+# depend on the selector is stored once.
+#
+# The bundle of each dataset version goes to <out>/<hash>/; <out>/index.html points at the
+# newest one. Exporting is skipped when the bundle for the current hash already exists.
+#
+#   python StaticExport.py --out site
+#   python StaticExport.py --out site --force
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = ["Homepage.py", "StudentSatisfaction.py", "PerformanceImpact.py", "StudentChallenge.py", "AssociationMatrix.py", "CrosstabExplorer.py"]
+
+PLOTLY_JS = os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js")
+
+
+def _charts(app):
+    # Figure specs of a rendered page, in page order
+    return [chart.proto.spec for chart in app.get("plotly_chart")]
+
+
+def render_page(page, timeout=120):
+    # {"title", "selector", "states": [{"option", "charts": [spec, ...]}]} of one page
+    app = AppTest.from_file(os.path.join(HERE, page), default_timeout=timeout).run()
+    if app.exception:
+        raise RuntimeError(f"{page} failed: {app.exception[0].value}")
+    title = app.header[0].value if app.header else page
+    if not app.selectbox:
+        return {"title": title, "selector": None, "states": [{"option": None, "charts": _charts(app)}]}
+
+    selector = app.selectbox[0]
+    states = []
+    for option in selector.options:
+        app.selectbox[0].select(option).run()
+        states.append({"option": option, "charts": _charts(app)})
+    return {"title": title, "selector": selector.label, "states": states}
+
+
+_PAGE_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="../plotly.min.js"></script>
+<style>body {{ font-family: sans-serif; max-width: 960px; margin: 2em auto; }} .chart {{ min-height: 450px; }}</style>
+</head>
+<body>
+<p><a href="index.html">All pages</a></p>
+<h1>{title}</h1>
+{selector}
+<div id="charts"></div>
+<script>
+const figures = {figures};
+const states = {states};
+function show(i) {{
+  const root = document.getElementById("charts");
+  root.innerHTML = "";
+  for (const id of states[i].charts) {{
+    const div = document.createElement("div");
+    div.className = "chart";
+    root.appendChild(div);
+    const spec = figures[id];
+    Plotly.newPlot(div, spec.data, spec.layout, {{responsive: true}});
+  }}
+}}
+show(0);
+</script>
+</body>
+</html>
+"""
+
+_INDEX_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Online Learning Survey</title></head>
+<body style="font-family: sans-serif; max-width: 960px; margin: 2em auto;">
+<h1>Online Learning Survey</h1>
+<p>Dataset {version}, exported {exported}.</p>
+<ul>
+{links}
+</ul>
+</body>
+</html>
+"""
+
+
+def _selector_html(page):
+    if not page["selector"]:
+        return ""
+    options = "".join(
+        f'<option value="{i}">{html.escape(str(state["option"]))}</option>'
+        for i, state in enumerate(page["states"])
+    )
+    return f'<label>{html.escape(page["selector"])} <select onchange="show(this.value)">{options}</select></label>'
+
+
+def _write(path, text):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def export(out, force=False, timeout=120):
+    # Write the bundle of the current dataset version; returns its directory (existing bundles are reused)
+    version = SurveyData.dataset_hash()[:16]
+    bundle = os.path.join(out, version)
+    if os.path.exists(os.path.join(bundle, "manifest.json")) and not force:
+        return bundle
+
+    os.makedirs(os.path.join(bundle, "charts"), exist_ok=True)
+    manifest = {"version": version, "exported": time.strftime("%Y-%m-%d %H:%M:%S"), "pages": {}}
+    for page in PAGES:
+        rendered = render_page(page, timeout)
+        figures, states = {}, []
+        for state in rendered["states"]:
+            ids = []
+            for spec in state["charts"]:
+                chart_id = hashlib.sha256(spec.encode()).hexdigest()[:16]
+                if chart_id not in figures:
+                    figures[chart_id] = json.loads(spec)
+                    _write(os.path.join(bundle, "charts", f"{chart_id}.json"), spec)
+                ids.append(chart_id)
+            states.append({"option": state["option"], "charts": ids})
+
+        name = page.replace(".py", ".html")
+        _write(os.path.join(bundle, name), _PAGE_HTML.format(
+            title=html.escape(rendered["title"]),
+            selector=_selector_html(rendered),
+            figures=json.dumps(figures),
+            states=json.dumps(states),
+        ))
+        manifest["pages"][name] = {"title": rendered["title"], "selector": rendered["selector"], "states": states}
+
+    links = "\n".join(
+        f'<li><a href="{name}">{html.escape(page["title"])}</a></li>' for name, page in manifest["pages"].items()
+    )
+    _write(os.path.join(bundle, "index.html"), _INDEX_HTML.format(version=version, exported=manifest["exported"], links=links))
+    # the manifest goes last: its presence marks a complete bundle
+    _write(os.path.join(bundle, "manifest.json"), json.dumps(manifest, indent=2))
+    return bundle
+
+
+def publish(out, bundle):
+    # Point <out>/index.html at a bundle and make plotly.js available next to it
+    if not os.path.exists(os.path.join(out, "plotly.min.js")):
+        shutil.copyfile(PLOTLY_JS, os.path.join(out, "plotly.min.js"))
+    version = os.path.basename(bundle)
+    _write(os.path.join(out, "index.html"), (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f'<meta http-equiv="refresh" content="0; url={version}/index.html"></head>'
+        f'<body><a href="{version}/index.html">Online Learning Survey</a></body></html>\n'
+    ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export every dashboard chart and selector state as a static site.")
+    parser.add_argument("--out", default=os.path.join(HERE, "static_export"), help="output directory (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="re-export even if the current dataset was exported already")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per page render")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+    bundle = export(args.out, args.force, args.timeout)
+    publish(args.out, bundle)
+    print(f"Static export of dataset {os.path.basename(bundle)} in {bundle} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+from CrossFilter import current_cube
+from ChartData import box_stats
+from DataExport import export_buttons
+from PageTimings import lap, show_chart
+from SurveyStats import describe_chi_square, difference, format_p, interval
+
+lap("imports")
 
 st.header("Analysis of Students’ Challenges and Learning Performance in Online Education")
 
@@ -10,11 +17,8 @@ st.write(
     """
 )
 
-# Load CSV from GitHub
-url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-1/refs/heads/main/ONLINE%20EDUCATION%20SYSTEM%20REVIEW.csv"
-
-# Read the dataset
-df = pd.read_csv(url)
+# Precomputed aggregates of the dataset (shared, cached), with the sidebar filters applied
+cube = current_cube()
 
 col1, col2 = st.columns(2)
 
@@ -36,19 +40,32 @@ col2.metric(
 
 st.subheader("Does not having a study room could be a reason of bad performance in online learning?")
 
-fig = px.histogram(
-    df,
-    x='Performance in online',
-    color='Have separate room for studying?',
-    barmode='group',
-    title='Impact of Having a Study Room on Online Learning Performance',
-    color_discrete_map={
-        'Yes': 'blue',
-        'No': 'red'
-    }
-)
-
-st.plotly_chart(fig)
+lap("layout")
+
+# Number of students per score with and without a study room, counted on the server
+room_counts = cube.counts_for('Performance in online', 'Have separate room for studying?').reset_index()
+room_counts = room_counts[room_counts['count'] > 0]
+
+lap("transform", "study_room")
+
+def study_room_figure():
+    fig = px.bar(
+        room_counts,
+        x='Performance in online',
+        y='count',
+        color='Have separate room for studying?',
+        barmode='group',
+        title='Impact of Having a Study Room on Online Learning Performance',
+        color_discrete_map={
+            'Yes': 'blue',
+            'No': 'red'
+        }
+    )
+    return fig
+
+show_chart("study_room", study_room_figure)
+export_buttons("study_room", room_counts)
+st.caption(describe_chi_square(cube.crosstab('Performance in online', 'Have separate room for studying?')) + ".")
 
 st.write(
     """
@@ -63,24 +80,74 @@ However, while having a study room seems to support better concentration and pro
 
 st.subheader("Does not joining study group can influence the performance in online learning?")
 
-fig = px.box(
-    df,
-    x='Engaged in group studies?',
-    y='Performance in online',
-    title='Online Performance Distribution by Group Study Engagement',
-    labels={
-        'Engaged in group studies?': 'Engaged in Group Studies?',
-        'Performance in online': 'Online Performance Score'
-    },
-    color='Engaged in group studies?',
-    color_discrete_map={
-        'Yes': 'blue',
-        'No': 'red'
-    }
-)
+# Quartiles and whiskers per group, computed on the server from the score counts
+group_performance = cube.crosstab('Engaged in group studies?', 'Performance in online')
+group_colors = {
+    'Yes': 'blue',
+    'No': 'red'
+}
+
+# Median and interquartile range of each group, with 95% bootstrap intervals
+group_scores = group_performance.columns.to_numpy()
+spread = {
+    group: (interval(group_scores, counts.to_numpy(), 'median'), interval(group_scores, counts.to_numpy(), 'iqr'))
+    for group, counts in group_performance.iterrows()
+}
 
-fig.update_layout(width=600, height=500)
-st.plotly_chart(fig)
+lap("transform", "group_study")
+
+def group_study_figure():
+    fig = go.Figure()
+
+    for group, counts in group_performance.iterrows():
+        stats = box_stats(counts.index, counts.values)
+        fig.add_trace(
+            go.Box(
+                x=[group],
+                q1=[stats['q1']],
+                median=[stats['median']],
+                q3=[stats['q3']],
+                lowerfence=[stats['lowerfence']],
+                upperfence=[stats['upperfence']],
+                name=group,
+                marker_color=group_colors[group]
+            )
+        )
+        # Outlying scores, one marker per distinct value
+        if len(stats['outliers']):
+            fig.add_trace(
+                go.Scatter(
+                    x=[group] * len(stats['outliers']),
+                    y=stats['outliers'],
+                    mode='markers',
+                    marker_color=group_colors[group],
+                    showlegend=False
+                )
+            )
+
+    fig.update_layout(
+        title='Online Performance Distribution by Group Study Engagement',
+        xaxis_title='Engaged in Group Studies?',
+        yaxis_title='Online Performance Score',
+        legend_title_text='Engaged in Group Studies?',
+        width=600,
+        height=500
+    )
+    return fig
+
+show_chart("group_study", group_study_figure)
+export_buttons("group_study", group_performance)
+
+caption = " ".join(
+    f"{group}: median {median[0]:.1f} (95% CI {median[1]:.1f}–{median[2]:.1f}), IQR {iqr[0]:.1f} (95% CI {iqr[1]:.1f}–{iqr[2]:.1f})."
+    for group, (median, iqr) in spread.items()
+)
+if {'Yes', 'No'} <= set(group_performance.index):
+    gap, low, high, p = difference(
+        group_scores, group_performance.loc['Yes'].to_numpy(), group_performance.loc['No'].to_numpy(), 'iqr'
+    )
+    caption += f" IQR difference (Yes − No): {gap:+.1f} (95% CI {low:+.1f} to {high:+.1f}, bootstrap {format_p(p)})."
+st.caption(f"{caption} {describe_chi_square(group_performance)}.")
 
 st.write(
     """
@@ -96,12 +163,9 @@ This implies that group study engagement may help stabilize performance levels a
 
 st.subheader("Does economic status affect the performance in online learning?")
 
-# Group performance to reduce noise
-df['Performance Group'] = pd.cut(
-    df['Performance in online'],
-    bins=[0, 3, 7, 10],
-    labels=['Low', 'Medium', 'High']
-)
+# Performance grouped to reduce noise (Low 1–3, Medium 4–7, High 8–10), counted per economic status
+econ_groups = cube.counts_for('Economic status', 'Performance Group').reset_index()
+econ_groups = econ_groups[econ_groups['count'] > 0]
 
 # Color scheme
 color_map = {
@@ -110,35 +174,42 @@ color_map = {
     'High': '#1f77b4'    # Blue
 }
 
-# Pie chart with facets
-fig = px.pie(
-    df,
-    names='Performance Group',
-    facet_col='Economic status',
-    hole=0.35,
-    title='Online Performance by Economic Status (Grouped)',
-)
-
-# Apply consistent color mapping
-fig.update_traces(
-    marker=dict(colors=[color_map[v] for v in sorted(df['Performance Group'].unique())]),
-    textinfo='percent',
-    hovertemplate='%{label}: %{percent} <extra></extra>'
-)
-
-# Layout improvements
-fig.update_layout(
-    width=950,
-    height=450,
-    title_x=0,
-    margin=dict(t=60, l=40, r=40, b=40),
-    showlegend=True
-)
-
-# Move facet titles (economic status labels) to the left
-fig.for_each_annotation(lambda a: a.update(xanchor='left', x=a.x - 0.07))
-
-st.plotly_chart(fig)
+lap("transform", "economic_status")
+
+def economic_status_figure():
+    # Pie chart with facets
+    fig = px.pie(
+        econ_groups,
+        names='Performance Group',
+        values='count',
+        facet_col='Economic status',
+        hole=0.35,
+        title='Online Performance by Economic Status (Grouped)',
+        color='Performance Group',
+        color_discrete_map=color_map  # Apply consistent color mapping
+    )
+
+    fig.update_traces(
+        textinfo='percent',
+        hovertemplate='%{label}: %{percent} <extra></extra>'
+    )
+
+    # Layout improvements
+    fig.update_layout(
+        width=950,
+        height=450,
+        title_x=0,
+        margin=dict(t=60, l=40, r=40, b=40),
+        showlegend=True
+    )
+
+    # Move facet titles (economic status labels) to the left
+    fig.for_each_annotation(lambda a: a.update(xanchor='left', x=a.x - 0.07))
+    return fig
+
+show_chart("economic_status", economic_status_figure)
+export_buttons("economic_status", econ_groups)
+st.caption(describe_chi_square(cube.crosstab('Economic status', 'Performance Group')) + ".")
 
 st.write(
     """
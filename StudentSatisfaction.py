@@ -1,6 +1,12 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from CrossFilter import current_cube
+from DataExport import export_buttons
+from PageTimings import lap, show_chart
+from SurveySchema import SATISFACTION_SCORES
+from SurveyStats import describe_chi_square, difference, format_p, interval
+
+lap("imports")
 
 st.header("Analysis of Students’ Satisfaction with Online Learning During COVID-19")
 
@@ -10,9 +16,6 @@ st.write(
     """
 )
 
-# Load CSV from GitHub
-url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-1/refs/heads/main/ONLINE%20EDUCATION%20SYSTEM%20REVIEW.csv"
-
 col1, col2, col3 = st.columns(3)
 
 col1.metric(
@@ -36,20 +39,18 @@ col3.metric(
     border=True
 )
 
-# Read the dataset
-df = pd.read_csv(url)
+# Precomputed aggregates of the dataset (shared, cached), with the sidebar filters applied
+cube = current_cube()
 
 #add subheader
 st.subheader("Are students satisfied with internet facilities during online learning?")
 
-# Map satisfaction levels to numerical values
-satisfaction_mapping = {'Bad': 1, 'Average': 2, 'Good': 3}
-df['Satisfaction_Score'] = df['Your level of satisfaction in Online Education'].map(satisfaction_mapping)
+lap("layout")
 
-# Group and calculate average satisfaction score per internet quality
-avg_satisfaction_by_internet = df.groupby(
-    'Internet facility in your locality'
-)['Satisfaction_Score'].mean().reset_index()
+# Average satisfaction score (Bad = 1, Average = 2, Good = 3) per internet quality
+avg_satisfaction_by_internet = cube.mean(
+    'Satisfaction_Score', 'Internet facility in your locality'
+).reset_index()
 
 # Map internet facility labels
 internet_labels = {1: 'Very Poor', 2: 'Poor', 3: 'Average', 4: 'Good', 5: 'Excellent'}
@@ -57,41 +58,73 @@ avg_satisfaction_by_internet['Internet Facility'] = avg_satisfaction_by_internet
     'Internet facility in your locality'
 ].map(internet_labels)
 
-# Plot bar chart (BLUE → GREY → RED continuous palette)
-fig = px.bar(
-    avg_satisfaction_by_internet,
-    x='Internet Facility',
-    y='Satisfaction_Score',
-    title='Average Online Education Satisfaction by Internet Facility',
-    labels={
-        'Internet Facility': 'Internet Facility Quality',
-        'Satisfaction_Score': 'Average Satisfaction'
-    },
-    color='Satisfaction_Score',
-    color_continuous_scale='RdBu_r'  # Reverse to get Blue=Good, Red=Bad
-)
-
-# Keep proper order
-fig.update_layout(
-    xaxis={
-        'categoryorder': 'array',
-        'categoryarray': [internet_labels[i] for i in sorted(internet_labels)]
-    },
-    width=800,
-    height=500,
-    coloraxis_colorbar=dict(title="Satisfaction Score"),
-)
-
-# Add legend explanation
-fig.add_annotation(
-    text="Scale: Red = Good, Grey = Average, Blue = Bad",
-    xref="paper", yref="paper",
-    x=0, y=-0.2,
-    showarrow=False,
-    font=dict(size=10)
-)
-
-st.plotly_chart(fig, use_container_width=True)
+# 95% bootstrap interval of each mean, resampled from the satisfaction counts per internet quality
+internet_satisfaction_counts = cube.crosstab(
+    'Internet facility in your locality', 'Your level of satisfaction in Online Education'
+)
+satisfaction_values = internet_satisfaction_counts.columns.map(SATISFACTION_SCORES).to_numpy()
+intervals = {
+    level: interval(satisfaction_values, counts.to_numpy(), 'mean')
+    for level, counts in internet_satisfaction_counts.iterrows()
+}
+levels = avg_satisfaction_by_internet['Internet facility in your locality']
+avg_satisfaction_by_internet['error_plus'] = [intervals[l][2] - intervals[l][0] for l in levels]
+avg_satisfaction_by_internet['error_minus'] = [intervals[l][0] - intervals[l][1] for l in levels]
+
+lap("transform", "internet_satisfaction")
+
+def internet_satisfaction_figure():
+    # Plot bar chart (BLUE → GREY → RED continuous palette)
+    fig = px.bar(
+        avg_satisfaction_by_internet,
+        x='Internet Facility',
+        y='Satisfaction_Score',
+        title='Average Online Education Satisfaction by Internet Facility',
+        labels={
+            'Internet Facility': 'Internet Facility Quality',
+            'Satisfaction_Score': 'Average Satisfaction'
+        },
+        color='Satisfaction_Score',
+        color_continuous_scale='RdBu_r',  # Reverse to get Blue=Good, Red=Bad
+        error_y='error_plus',
+        error_y_minus='error_minus'
+    )
+
+    # Keep proper order
+    fig.update_layout(
+        xaxis={
+            'categoryorder': 'array',
+            'categoryarray': [internet_labels[i] for i in sorted(internet_labels)]
+        },
+        width=800,
+        height=500,
+        coloraxis_colorbar=dict(title="Satisfaction Score"),
+    )
+
+    # Add legend explanation
+    fig.add_annotation(
+        text="Scale: Red = Good, Grey = Average, Blue = Bad",
+        xref="paper", yref="paper",
+        x=0, y=-0.2,
+        showarrow=False,
+        font=dict(size=10)
+    )
+    return fig
+
+show_chart("internet_satisfaction", internet_satisfaction_figure, use_container_width=True)
+export_buttons("internet_satisfaction", avg_satisfaction_by_internet)
+
+# Excellent vs Very Poor internet: difference of the mean satisfaction, with its bootstrap interval
+caption = f"Error bars: 95% bootstrap confidence intervals. {describe_chi_square(internet_satisfaction_counts)}."
+if {1, 5} <= set(internet_satisfaction_counts.index):
+    gap, low, high, p = difference(
+        satisfaction_values,
+        internet_satisfaction_counts.loc[5].to_numpy(),
+        internet_satisfaction_counts.loc[1].to_numpy(),
+        'mean'
+    )
+    caption += f" Excellent vs Very Poor: {gap:+.2f} (95% CI {low:+.2f} to {high:+.2f}, bootstrap {format_p(p)})."
+st.caption(caption)
 
 st.write(
     """
@@ -105,38 +138,44 @@ st.write(
 st.subheader("Does higher interaction in online classes lead to greater student satisfaction?")
 
 # Create a cross-tabulation of online interaction mode and satisfaction level
-interaction_satisfaction_counts = pd.crosstab(
-    df['Your interaction in online mode'],
-    df['Your level of satisfaction in Online Education']
+interaction_satisfaction_counts = cube.crosstab(
+    'Your interaction in online mode',
+    'Your level of satisfaction in Online Education'
 )
 
 # Map interaction levels to descriptive labels for better readability
 interaction_labels = {1: 'Very Low', 2: 'Low', 3: 'Average', 4: 'High', 5: 'Very High'}
 interaction_satisfaction_counts.index = interaction_satisfaction_counts.index.map(interaction_labels)
 
-# Reorder columns for consistent stacking (Bad, Average, Good)
-interaction_satisfaction_counts = interaction_satisfaction_counts[['Bad', 'Average', 'Good']]
-
-# Create stacked bar chart
-fig = px.bar(
-    interaction_satisfaction_counts,
-    x=interaction_satisfaction_counts.index,
-    y=['Bad', 'Average', 'Good'],
-    title='Online Interaction vs. Online Education Satisfaction',
-    labels={
-        'x': 'Your Interaction in Online Mode',
-        'value': 'Number of Students',
-        'variable': 'Satisfaction Level'
-    },
-    color_discrete_map={'Bad': 'red', 'Average': 'grey', 'Good': 'blue'} # Assign colors
-)
-
-# Ensure the x-axis order is correct
-fig.update_layout(
-    xaxis={'categoryorder': 'array', 'categoryarray': [interaction_labels[i] for i in sorted(interaction_labels)]}
-)
-
-st.plotly_chart(fig, use_container_width=True)
+# Reorder columns for consistent stacking (Bad, Average, Good); levels filtered out count as 0
+interaction_satisfaction_counts = interaction_satisfaction_counts.reindex(columns=['Bad', 'Average', 'Good'], fill_value=0)
+
+lap("transform", "interaction_satisfaction")
+
+def interaction_satisfaction_figure():
+    # Create stacked bar chart
+    fig = px.bar(
+        interaction_satisfaction_counts.reset_index(),
+        x=interaction_satisfaction_counts.index.name,   # by column name: labels such as 'Average' are also column names
+        y=['Bad', 'Average', 'Good'],
+        title='Online Interaction vs. Online Education Satisfaction',
+        labels={
+            'x': 'Your Interaction in Online Mode',
+            'value': 'Number of Students',
+            'variable': 'Satisfaction Level'
+        },
+        color_discrete_map={'Bad': 'red', 'Average': 'grey', 'Good': 'blue'} # Assign colors
+    )
+
+    # Ensure the x-axis order is correct
+    fig.update_layout(
+        xaxis={'categoryorder': 'array', 'categoryarray': [interaction_labels[i] for i in sorted(interaction_labels)]}
+    )
+    return fig
+
+show_chart("interaction_satisfaction", interaction_satisfaction_figure, use_container_width=True)
+export_buttons("interaction_satisfaction", interaction_satisfaction_counts)
+st.caption(describe_chi_square(interaction_satisfaction_counts) + ".")
 
 st.write(
     """
@@ -150,39 +189,45 @@ st.write(
 st.subheader("Does having quick and easy communication with faculty improve students’ satisfaction in online learning?")
 
 # Create a cross-tabulation of clearing doubts and satisfaction level
-doubts_satisfaction_counts = pd.crosstab(
-    df['Clearing doubts with faculties in online mode'],
-    df['Your level of satisfaction in Online Education']
+doubts_satisfaction_counts = cube.crosstab(
+    'Clearing doubts with faculties in online mode',
+    'Your level of satisfaction in Online Education'
 )
 
 # Map clearing doubts levels to descriptive labels
 doubts_labels = {1: 'Very Difficult', 2: 'Difficult', 3: 'Average', 4: 'Easy', 5: 'Very Easy'}
 doubts_satisfaction_counts.index = doubts_satisfaction_counts.index.map(doubts_labels)
 
-# Reorder columns for consistent grouping (Bad, Average, Good)
-doubts_satisfaction_counts = doubts_satisfaction_counts[['Bad', 'Average', 'Good']]
-
-# Create grouped bar chart
-fig = px.bar(
-    doubts_satisfaction_counts,
-    x=doubts_satisfaction_counts.index,
-    y=['Bad', 'Average', 'Good'],
-    barmode='group',  # Use 'group' for grouped bars
-    title='Clearing Doubts with Faculties vs. Online Education Satisfaction',
-    labels={
-        'x': 'Clearing Doubts with Faculties',
-        'value': 'Number of Students',
-        'variable': 'Satisfaction Level'
-    },
-    color_discrete_map={'Bad': 'red', 'Average': 'grey', 'Good': 'blue'} # Assign colors
-)
-
-# Ensure the x-axis order is correct
-fig.update_layout(
-    xaxis={'categoryorder': 'array', 'categoryarray': [doubts_labels[i] for i in sorted(doubts_labels)]}
-)
-
-st.plotly_chart(fig, use_container_width=True)
+# Reorder columns for consistent grouping (Bad, Average, Good); levels filtered out count as 0
+doubts_satisfaction_counts = doubts_satisfaction_counts.reindex(columns=['Bad', 'Average', 'Good'], fill_value=0)
+
+lap("transform", "doubts_satisfaction")
+
+def doubts_satisfaction_figure():
+    # Create grouped bar chart
+    fig = px.bar(
+        doubts_satisfaction_counts.reset_index(),
+        x=doubts_satisfaction_counts.index.name,   # by column name: labels such as 'Average' are also column names
+        y=['Bad', 'Average', 'Good'],
+        barmode='group',  # Use 'group' for grouped bars
+        title='Clearing Doubts with Faculties vs. Online Education Satisfaction',
+        labels={
+            'x': 'Clearing Doubts with Faculties',
+            'value': 'Number of Students',
+            'variable': 'Satisfaction Level'
+        },
+        color_discrete_map={'Bad': 'red', 'Average': 'grey', 'Good': 'blue'} # Assign colors
+    )
+
+    # Ensure the x-axis order is correct
+    fig.update_layout(
+        xaxis={'categoryorder': 'array', 'categoryarray': [doubts_labels[i] for i in sorted(doubts_labels)]}
+    )
+    return fig
+
+show_chart("doubts_satisfaction", doubts_satisfaction_figure, use_container_width=True)
+export_buttons("doubts_satisfaction", doubts_satisfaction_counts)
+st.caption(describe_chi_square(doubts_satisfaction_counts) + ".")
 
 st.write(
     """
@@ -0,0 +1,118 @@
+import logging
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from SurveyCube import BACKEND, append_rows
+from SurveyData import dataset_hash
+from SurveySchema import add_derived, validate_responses
+
+# New survey responses added to the running dashboard without recomputing it.
+# A batch in the 23-column schema is validated, given its derived columns and folded into
+# a delta cube that SurveyCube merges onto the cube of the current dataset version; cached
+# filtered cubes pick the batch up (only its matching rows) the next time they are used.
+# Every step costs time in the size of the batch, not of the survey.
+#
+# Batches come in through append_responses() or, with SURVEY_DROP_DIR set, as CSV files
+# moved into that directory (write elsewhere, then rename in). Each file is claimed by
+# renaming it into processing/ and ends up in processed/ or, with a .error.txt note beside
+# it, in rejected/. The appended rows are kept in SurveyCube.APPEND_DIR, so they survive a
+# restart and are seen by every replica sharing that directory.
+# Appended batches apply on top of the dataset version they were added to; once the
+# source itself changes (a new CSV or snapshot) they are expected to be part of it.
+
+# Directory watched for new response batches (unset = no watcher)
+DROP_DIR = os.environ.get("SURVEY_DROP_DIR")
+
+# Seconds between scans of the drop directory
+DROP_INTERVAL = float(os.environ.get("SURVEY_DROP_INTERVAL", "5"))
+
+_log = logging.getLogger(__name__)
+
+
+def append_responses(batch):
+    # Validate a DataFrame of new responses and add it to the current dataset; returns the number of rows added
+    if BACKEND != "memory":
+        raise ValueError("Appending responses needs the in-memory backend (SURVEY_BACKEND=memory)")
+    typed = add_derived(validate_responses(batch))
+    append_rows(dataset_hash(), typed)
+    return len(typed)
+
+
+def _move(path, folder):
+    # from processing/ into processed/ or rejected/ beside it
+    target = os.path.join(os.path.dirname(os.path.dirname(path)), folder)
+    os.makedirs(target, exist_ok=True)
+    return shutil.move(path, os.path.join(target, os.path.basename(path)))
+
+
+def _claim(path):
+    # Rename a dropped file into processing/ before reading it. The rename is atomic, so when
+    # several processes watch the same directory exactly one of them gets the file (None for the others)
+    target = os.path.join(os.path.dirname(path), "processing")
+    os.makedirs(target, exist_ok=True)
+    claimed = os.path.join(target, os.path.basename(path))
+    try:
+        os.rename(path, claimed)
+    except FileNotFoundError:
+        return None
+    return claimed
+
+
+def _mtime(path):
+    # 0 for a file another process has just claimed (process_file skips it)
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def process_file(path):
+    # Append one dropped CSV batch, then move it to processed/ (or rejected/ with the reason)
+    path = _claim(path)
+    if path is None:
+        return 0
+    try:
+        rows = append_responses(pd.read_csv(path))
+    except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        rejected = _move(path, "rejected")
+        with open(rejected + ".error.txt", "w") as f:
+            f.write(f"{e}\n")
+        return 0
+    _move(path, "processed")
+    return rows
+
+
+def scan(directory):
+    # Append every CSV batch waiting in the drop directory, oldest first; returns the rows added
+    waiting = [
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".csv") and not name.startswith(".")
+    ]
+    return sum(process_file(path) for path in sorted(waiting, key=_mtime))
+
+
+def _watch(directory, interval):
+    # A failed scan is logged and retried on the next tick; the watcher never stops
+    while True:
+        try:
+            scan(directory)
+        except Exception:
+            _log.exception("Scanning %s for response batches failed", directory)
+        time.sleep(interval)
+
+
+@st.cache_resource(show_spinner=False)
+def start_drop_watcher(directory=DROP_DIR, interval=DROP_INTERVAL):
+    # Watch the drop directory in a background thread, once per process (no-op without SURVEY_DROP_DIR)
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    thread = threading.Thread(target=_watch, args=(directory, interval), daemon=True, name="survey-drop-watcher")
+    thread.start()
+    return thread
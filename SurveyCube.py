@@ -0,0 +1,380 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import SurveyData
+import SurveySnapshot
+from PageTimings import span
+from SurveyData import dataset_hash, iter_survey_chunks, load_survey_with_hash
+from SurveySchema import DERIVED_SCHEMA, add_derived, codes, domain, read_survey_csv_chunks
+
+# Materialized aggregates ("cube") behind the charts.
+# Every count, crosstab and group mean the pages show is a cuboid: a dense array of
+# counts (plus measure sums) indexed by the domain codes of its dimension columns.
+# All cuboids are filled together with a single bincount per row chunk, once per dataset
+# version, so the pages only ever read arrays whose size depends on the domains, not on the rows.
+# In streaming mode (SurveyData.STREAMING) the cube is folded from the CSV chunk by chunk in
+# a background thread, without the survey frame ever being built; until it is done the
+# pages render the responses read so far.
+# Batches of new responses (SurveyAppend) are kept as a separate delta cube that is merged
+# onto the base cube, so an append costs time in the size of the batch only.
+
+LEVEL = "Level of Education"
+PERFORMANCE = "Performance in online"
+SATISFACTION = "Your level of satisfaction in Online Education"
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CUBOIDS = [
+    # Homepage
+    ("Gender",),
+    (LEVEL,),
+    ("Home Location",),
+    ("Economic status",),
+    ("Age(Years)",),
+    # CrossFilter sidebar
+    ("Device type used to attend classes",),
+    # StudentSatisfaction
+    ("Internet facility in your locality",),
+    ("Internet facility in your locality", SATISFACTION),
+    ("Your interaction in online mode", SATISFACTION),
+    ("Clearing doubts with faculties in online mode", SATISFACTION),
+    # PerformanceImpact
+    (LEVEL, "Traditional_Score"),
+    (LEVEL, PERFORMANCE),
+    (PERFORMANCE, "Do elderly people monitor you?"),
+    # StudentChallenge
+    (PERFORMANCE, "Have separate room for studying?"),
+    ("Engaged in group studies?", PERFORMANCE),
+    ("Economic status", "Performance Group"),
+]
+
+
+def _satisfaction_score(df):
+    # Bad = 1, Average = 2, Good = 3 (0 = no answer, not counted)
+    score = df["Satisfaction_Score"].to_numpy().astype(float)
+    score[score == 0] = np.nan
+    return score
+
+
+# Measures averaged by the pages: name -> function returning one float per row (NaN = not counted)
+MEASURES = {
+    "Satisfaction_Score": _satisfaction_score,
+    "Study time (Hours)": lambda df: df["Study time (Hours)"].to_numpy().astype(float),
+}
+
+# Where the aggregates come from: "memory" (this cube) or "sqlite"/"duckdb" (SurveySql,
+# for surveys too large to hold in memory)
+BACKEND = os.environ.get("SURVEY_BACKEND", "memory")
+
+# Rows folded per bincount; bounds the temporary index arrays on large surveys
+CHUNK_ROWS = 250_000
+
+
+def _layout(cuboids):
+    shapes, offsets, size = [], [], 0
+    for dims in cuboids:
+        shape = tuple(len(domain(d)) for d in dims)
+        shapes.append(shape)
+        offsets.append(size)
+        size += int(np.prod(shape))
+    return shapes, offsets, size
+
+
+_SHAPES, _OFFSETS, _SIZE = _layout(CUBOIDS)
+
+
+class SurveyCube:
+    # Counts and measure sums of every cuboid, stored as flat arrays
+
+    def __init__(self):
+        self.rows = 0
+        self.counts = np.zeros(_SIZE, dtype=np.int64)
+        self.sums = {m: np.zeros(_SIZE) for m in MEASURES}
+        self.valid = {m: np.zeros(_SIZE, dtype=np.int64) for m in MEASURES}
+
+    def add_rows(self, df):
+        # Fold a chunk of survey rows into the cube
+        if not set(DERIVED_SCHEMA) <= set(df.columns):
+            df = add_derived(df)
+        row_codes = {col: codes(df[col]) for col in {d for dims in CUBOIDS for d in dims}}
+        parts = []
+        for dims, shape, offset in zip(CUBOIDS, _SHAPES, _OFFSETS):
+            cols = [row_codes[d] for d in dims]
+            present = np.logical_and.reduce([c >= 0 for c in cols])
+            flat = np.ravel_multi_index(cols, shape, mode="clip") + offset
+            # rows missing a dimension land in the overflow slot _SIZE
+            parts.append(np.where(present, flat, _SIZE))
+        index = np.concatenate(parts)
+
+        self.counts += np.bincount(index, minlength=_SIZE + 1)[:_SIZE]
+        for name, measure in MEASURES.items():
+            values = np.tile(measure(df), len(CUBOIDS))
+            seen = ~np.isnan(values)
+            self.sums[name] += np.bincount(index, weights=np.where(seen, values, 0.0), minlength=_SIZE + 1)[:_SIZE]
+            self.valid[name] += np.bincount(index, weights=seen, minlength=_SIZE + 1)[:_SIZE].astype(np.int64)
+        self.rows += len(df)
+        return self
+
+    def _cuboid(self, array, dims):
+        # The array shaped by dims, from the smallest stored cuboid covering them (extra dims summed out)
+        candidates = [
+            (len(stored), stored, shape, offset)
+            for stored, shape, offset in zip(CUBOIDS, _SHAPES, _OFFSETS)
+            if set(dims) <= set(stored)
+        ]
+        if not candidates:
+            raise KeyError(f"No cuboid covers {dims}; add it to SurveyCube.CUBOIDS")
+        _, stored, shape, offset = min(candidates, key=lambda c: c[0])
+        block = array[offset:offset + int(np.prod(shape))].reshape(shape)
+        extra = tuple(i for i, d in enumerate(stored) if d not in dims)
+        if extra:
+            block = block.sum(axis=extra)
+        kept = [d for d in stored if d in dims]
+        return np.transpose(block, [kept.index(d) for d in dims])
+
+    def copy(self):
+        cube = SurveyCube()
+        cube.rows = self.rows
+        cube.counts = self.counts.copy()
+        cube.sums = {m: a.copy() for m, a in self.sums.items()}
+        cube.valid = {m: a.copy() for m, a in self.valid.items()}
+        return cube
+
+    def merged(self, other):
+        # A new cube holding the rows of both cubes
+        cube = self.copy()
+        cube.rows += other.rows
+        cube.counts += other.counts
+        for m in MEASURES:
+            cube.sums[m] += other.sums[m]
+            cube.valid[m] += other.valid[m]
+        return cube
+
+    def _counts(self, dims):
+        return self._cuboid(self.counts, dims)
+
+    def _sums(self, measure, dims):
+        # (measure sums, number of rows with a value) for every combination of dims
+        return self._cuboid(self.sums[measure], dims), self._cuboid(self.valid[measure], dims)
+
+    @staticmethod
+    def _index(dims):
+        if len(dims) == 1:
+            return pd.Index(domain(dims[0]), name=dims[0])
+        return pd.MultiIndex.from_product([domain(d) for d in dims], names=list(dims))
+
+    def counts_for(self, *dims):
+        # Number of respondents for every combination of dims (zeros included)
+        return pd.Series(self._counts(dims).ravel(), index=self._index(dims), name="count")
+
+    def value_counts(self, dim):
+        # Same as df[dim].value_counts()
+        counts = self.counts_for(dim)
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def crosstab(self, row, col):
+        # Same as pd.crosstab(df[row], df[col])
+        table = pd.DataFrame(
+            self._counts((row, col)),
+            index=pd.Index(domain(row), name=row),
+            columns=pd.Index(domain(col), name=col),
+        )
+        return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+    def mean(self, measure, *dims):
+        # Same as df.groupby(list(dims))[measure].mean()
+        sums, valid = self._sums(measure, dims)
+        sums, valid = sums.ravel(), valid.ravel()
+        means = pd.Series(sums / np.maximum(valid, 1), index=self._index(dims), name=measure)
+        return means[valid > 0]
+
+
+def build_cube(df, rows=None):
+    # Aggregate a survey frame (or only the row positions in `rows`), CHUNK_ROWS rows at a time
+    cube = SurveyCube()
+    if rows is None:
+        for start in range(0, len(df), CHUNK_ROWS):
+            cube.add_rows(df.iloc[start:start + CHUNK_ROWS])
+    else:
+        for start in range(0, len(rows), CHUNK_ROWS):
+            cube.add_rows(df.take(rows[start:start + CHUNK_ROWS]))
+    return cube
+
+
+def fold_chunks(chunks):
+    # Fold survey frames into one cube, yielding the running cube after every chunk
+    cube = SurveyCube()
+    for chunk in chunks:
+        yield cube.add_rows(chunk)
+
+
+def stream_cube(source, chunk_rows=SurveyData.CHUNK_ROWS):
+    # Cube of a survey CSV (path or binary stream) read chunk_rows rows at a time,
+    # so memory stays bounded by the chunk size whatever the size of the file
+    cube = SurveyCube()
+    for cube in fold_chunks(read_survey_csv_chunks(source, chunk_rows)):
+        pass
+    return cube
+
+
+class _StreamedCube:
+    # Cube of one dataset version folded in a background thread; latest() is the
+    # cube of the chunks read so far (a copy, so readers never see a half-added chunk)
+
+    def __init__(self):
+        self.partial = SurveyCube()
+        self.done = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._first_chunk = threading.Event()
+        threading.Thread(target=self._fold, daemon=True, name="survey-stream").start()
+
+    def _fold(self):
+        try:
+            for cube in fold_chunks(iter_survey_chunks()[1]):
+                with self._lock:
+                    self.partial = cube.copy()
+                self._first_chunk.set()
+        except Exception as e:
+            self.error = e
+        self.done = True
+        self._first_chunk.set()
+
+    def latest(self):
+        self._first_chunk.wait()
+        if self.error is not None:
+            raise self.error
+        with self._lock:
+            return self.partial
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _streamed_cube(digest):
+    return _StreamedCube()
+
+
+def stream_progress():
+    # Responses read so far while the streamed cube is still loading, None once it is complete
+    if not SurveyData.STREAMING or BACKEND != "memory":
+        return None
+    streamed = _streamed_cube(dataset_hash())
+    return None if streamed.done else streamed.latest().rows
+
+
+# Response batches appended to a dataset version (see SurveyAppend). Every batch is written
+# as an Arrow file under APPEND_DIR/<digest>/ and its name added as a line to manifest.txt
+# there. The manifest, not process memory, is the record of what was appended: each process
+# replays the lines it has not seen yet (on startup, and whenever data_version() or a cube
+# is asked for), so a restarted process gets its batches back and replicas sharing
+# APPEND_DIR show the same rows. Batch rows are memory-mapped when a consumer reads them;
+# only the file paths and the cube of all appended rows stay in memory.
+APPEND_DIR = os.environ.get("SURVEY_APPEND_DIR", os.path.join(HERE, "appended"))
+
+# digest -> (list of batch files, oldest first; cube of their rows; manifest bytes replayed). Lists only grow.
+_appended = {}
+# digest -> (base cube, appended batches folded in, combined cube)
+_combined = {}
+_append_lock = threading.Lock()
+
+
+def _batch_dir(digest):
+    return os.path.join(APPEND_DIR, digest[:16])
+
+
+def _sync(digest):
+    # Fold in the batches listed in the manifest of a dataset version since the last look
+    manifest = os.path.join(_batch_dir(digest), "manifest.txt")
+    try:
+        size = os.path.getsize(manifest)
+    except OSError:
+        return
+    with _append_lock:
+        paths, cube, done = _appended.get(digest, ([], SurveyCube(), 0))
+        if size <= done:
+            return
+        # batches only apply on top of the version they were appended to
+        for stale in [d for d in _appended if d != digest]:
+            del _appended[stale]
+            _combined.pop(stale, None)
+        with open(manifest, "rb") as f:
+            f.seek(done)
+            lines = f.read(size - done)
+        # a line still being written is picked up next time
+        lines = lines[:lines.rfind(b"\n") + 1]
+        for name in lines.decode().split():
+            path = os.path.join(_batch_dir(digest), name)
+            cube = cube.merged(SurveyCube().add_rows(SurveySnapshot.read_snapshot(path)))
+            paths.append(path)
+        _appended[digest] = (paths, cube, done + len(lines))
+
+
+def append_rows(digest, batch):
+    # Add a validated batch (with derived columns) to a dataset version; costs O(batch), not O(survey)
+    directory = _batch_dir(digest)
+    os.makedirs(directory, exist_ok=True)
+    name = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}.arrow"
+    SurveySnapshot.write_snapshot(batch, os.path.join(directory, name), digest)
+    # one short O_APPEND write per batch, so lines from several processes never interleave
+    fd = os.open(os.path.join(directory, "manifest.txt"), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, f"{name}\n".encode())
+    finally:
+        os.close(fd)
+    _sync(digest)
+
+
+def appended_count(digest):
+    # Number of batches appended to a dataset version
+    _sync(digest)
+    return len(_appended.get(digest, ((), None))[0])
+
+
+def appended_batches(digest, start=0, stop=None):
+    # Batches appended to a dataset version, oldest first (read back from their files one at a time)
+    _sync(digest)
+    with _append_lock:
+        paths = _appended.get(digest, ([], None))[0][start:stop]
+    for path in paths:
+        yield SurveySnapshot.read_snapshot(path)
+
+
+def data_version():
+    # (content hash, appended batches) identifying the data the pages currently show
+    digest = dataset_hash()
+    return digest, appended_count(digest)
+
+
+def _with_appended(digest, base):
+    _sync(digest)
+    with _append_lock:
+        entry = _appended.get(digest)
+        if entry is None:
+            return base
+        paths, delta, _ = entry
+        combined = _combined.get(digest)
+        if combined is None or combined[0] is not base or combined[1] != len(paths):
+            combined = _combined[digest] = (base, len(paths), base.merged(delta))
+        return combined[2]
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cube_for(digest, _df):
+    with span("cube"):
+        return build_cube(_df)
+
+
+def get_cube():
+    # The cube of the current dataset version, shared by every session of this process
+    if BACKEND != "memory":
+        from SurveySql import get_sql_cube
+        return get_sql_cube()
+    if SurveyData.STREAMING:
+        digest = dataset_hash()
+        return _with_appended(digest, _streamed_cube(digest).latest())
+    digest, df = load_survey_with_hash()
+    return _with_appended(digest, _cube_for(digest, df))
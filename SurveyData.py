@@ -0,0 +1,272 @@
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from DataSources import DATA_URL, CsvFile, HttpSource, LocalFileSource, SnapshotFile, SnapshotSource, source_from_uri
+from PageTimings import span
+from SurveySchema import add_derived, apply_schema, read_survey_csv, read_survey_csv_chunks
+import SurveySnapshot
+
+# Shared data access for every page of the dashboard.
+# The survey is fetched once per process and parsed once per content hash;
+# the source is only revalidated (ETag / Last-Modified) after CACHE_TTL seconds.
+# When an ingested snapshot exists (see SurveySnapshot.py) it is memory-mapped instead,
+# so the replicas on a host share one copy of the data rather than each parsing the CSV.
+# In streaming mode a local CSV is never held in memory: it is hashed and read in chunks
+# straight from disk, and the cube is folded chunk by chunk (see SurveyCube).
+#
+# Fetches run on a background thread (see DataSources.py for the kinds of source). A page
+# waits at most REFRESH_WAIT seconds for a revalidation and otherwise keeps showing the
+# copy it has; the first fetch of a process waits up to FETCH_TIMEOUT seconds and then
+# falls back to the offline copy of the last good remote fetch, so the app also starts
+# without network access once it has been online.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Source of the dataset as a URI (see DataSources.py); unset = the newest snapshot, else the
+# local CSV, else DATA_URL
+SOURCE = os.environ.get("SURVEY_SOURCE", "")
+
+# Local copy shipped with the repo, read first when it is present
+LOCAL_PATH = os.environ.get("SURVEY_LOCAL_PATH", os.path.join(HERE, "ONLINE EDUCATION SYSTEM REVIEW.csv"))
+
+# Directory of the ingested snapshots, used in preference to the CSV ("" = always read the CSV)
+SNAPSHOT_DIR = os.environ.get("SURVEY_SNAPSHOT_DIR", SurveySnapshot.SNAPSHOT_DIR)
+
+# Last good copy of a remote source, used when the source cannot be reached ("" = none kept)
+OFFLINE_DIR = os.environ.get("SURVEY_OFFLINE_DIR", os.path.join(HERE, "offline"))
+
+# Stream a local CSV in chunks instead of loading it whole (for surveys larger than memory)
+STREAMING = os.environ.get("SURVEY_STREAMING", "") not in ("", "0")
+
+# Rows per chunk when the survey is read in chunks
+CHUNK_ROWS = int(os.environ.get("SURVEY_CHUNK_ROWS", "250000"))
+
+# Seconds between revalidations of the source (0 = check on every call)
+CACHE_TTL = float(os.environ.get("SURVEY_CACHE_TTL", "600"))
+
+# Timeout of each remote request
+HTTP_TIMEOUT = float(os.environ.get("SURVEY_HTTP_TIMEOUT", "10"))
+
+# Seconds the first load waits for the source before using the offline copy
+FETCH_TIMEOUT = float(os.environ.get("SURVEY_FETCH_TIMEOUT", "15"))
+
+# Seconds a page waits for a revalidation before carrying on with its current copy
+REFRESH_WAIT = float(os.environ.get("SURVEY_REFRESH_WAIT", "0.1"))
+
+_lock = threading.Lock()
+_state = {
+    "raw": None,          # CSV bytes, a CsvFile / SnapshotFile path, or a raw DataFrame (database)
+    "digest": None,       # content hash (for a snapshot: of the CSV it was ingested from)
+    "validator": None,    # what the source needs to tell whether our copy is current
+    "source": None,       # name of the source the dataset came from
+    "checked": 0.0,       # monotonic time of the last revalidation
+}
+
+# The configured sources, in order of preference (built on first use)
+_sources = None
+
+# One fetch at a time, shared by every session that finds the copy stale
+_fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="survey-fetch")
+_pending = None
+
+
+def _configured_sources():
+    if SOURCE:
+        return [source_from_uri(SOURCE, STREAMING, HTTP_TIMEOUT)]
+    sources = [SnapshotSource(SNAPSHOT_DIR)] if SNAPSHOT_DIR else []
+    return sources + [LocalFileSource(LOCAL_PATH, STREAMING), HttpSource(DATA_URL, HTTP_TIMEOUT)]
+
+
+def current_source():
+    # The first available configured source (the last one when none is)
+    global _sources
+    if _sources is None:
+        _sources = _configured_sources()
+    return next((source for source in _sources if source.available()), _sources[-1])
+
+
+def _offline_paths():
+    return os.path.join(OFFLINE_DIR, "survey.csv"), os.path.join(OFFLINE_DIR, "survey.json")
+
+
+def _save_offline(name, raw, digest, validator):
+    # Keep the CSV of a remote fetch for when the source cannot be reached
+    data, meta = _offline_paths()
+    os.makedirs(OFFLINE_DIR, exist_ok=True)
+    for path, content in ((data, raw), (meta, json.dumps({"source": name, "digest": digest, "validator": validator}).encode())):
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+
+def _load_offline():
+    # Install the offline copy when nothing else has been loaded; False if there is none
+    data, meta = _offline_paths()
+    if not OFFLINE_DIR or not os.path.exists(meta):
+        return False
+    with open(meta) as f:
+        info = json.load(f)
+    with open(data, "rb") as f:
+        raw = f.read()
+    validator = tuple(info["validator"]) if info["validator"] else None
+    with _lock:
+        if _state["raw"] is None:
+            _state.update(raw=raw, digest=info["digest"], validator=validator, source=info["source"])
+    return True
+
+
+def _fetch(source):
+    # Runs on the fetch thread: revalidate the source and install what it returns
+    with _lock:
+        validator = _state["validator"] if _state["source"] == source.name else None
+    try:
+        result = source.fetch(validator)
+    except OSError:
+        raise
+    except Exception as e:
+        # any other failure of a source (a sqlite3.Error, a malformed payload) is handled
+        # like an unreachable one: the copy already loaded, or the offline copy, is served
+        raise OSError(f"Survey source {source.name} failed: {e!r}") from e
+    finally:
+        with _lock:
+            _state["checked"] = time.monotonic()
+    if result is None:
+        return
+    if source.remote and OFFLINE_DIR and isinstance(result[0], bytes):
+        try:
+            _save_offline(source.name, *result)
+        except OSError:
+            pass
+    raw, digest, validator = result
+    with _lock:
+        # the sources may have been replaced meanwhile (use_local_path)
+        if source in _sources:
+            _state.update(raw=raw, digest=digest, validator=validator, source=source.name)
+
+
+def _revalidate():
+    # Returns (content hash, payload) of the current dataset, refreshing it when the TTL has expired
+    global _pending
+    with _lock:
+        if _state["raw"] is not None and time.monotonic() - _state["checked"] < CACHE_TTL:
+            return _state["digest"], _state["raw"]
+        if _pending is None or _pending.done():
+            _pending = _fetcher.submit(_fetch, current_source())
+            _pending.source = current_source().name
+        pending, have_copy = _pending, _state["raw"] is not None
+
+    try:
+        with span("fetch"):
+            pending.result(timeout=REFRESH_WAIT if have_copy else FETCH_TIMEOUT)
+    except OSError as e:
+        # Too slow (TimeoutError is an OSError) or unreachable: keep serving the copy we
+        # have (the fetch carries on in the background), or fall back to the offline copy
+        if not have_copy and not _load_offline():
+            raise OSError(f"Survey source {pending.source} unavailable and no offline copy: {e!r}") from e
+    with _lock:
+        return _state["digest"], _state["raw"]
+
+
+_READ_ONLY = "The shared survey frame is read-only; derive a new frame (e.g. df.assign(...)) instead"
+
+
+class SharedSurveyFrame(pd.DataFrame):
+    # The process-wide survey frame: columns cannot be added, replaced or removed, its
+    # labels cannot be reassigned, inplace=True methods are refused and the column arrays
+    # are read-only. Anything derived from it is an ordinary DataFrame.
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __setattr__(self, name, value):
+        # neither the labels nor a column (df.Gender = ...) can be reassigned
+        if name in ("columns", "index") or (not name.startswith("_") and name in getattr(self, "columns", ())):
+            raise TypeError(_READ_ONLY)
+        super().__setattr__(name, value)
+
+    def _update_inplace(self, result, verify_is_copy=True):
+        # every inplace=True method (rename, drop, fillna, replace, ...) ends here
+        raise TypeError(_READ_ONLY)
+
+    def __setitem__(self, key, value):
+        raise TypeError(_READ_ONLY)
+
+    def __delitem__(self, key):
+        raise TypeError(_READ_ONLY)
+
+    def insert(self, *args, **kwargs):
+        raise TypeError(_READ_ONLY)
+
+
+def _freeze(df):
+    frame = SharedSurveyFrame(df)
+    # Lock the arrays behind every column, so in-place writes (.loc/.iloc) fail as well
+    for block in frame._mgr.blocks:
+        values = getattr(block.values, "_ndarray", block.values)
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return frame
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _parse(digest, _raw):
+    # Parsed once per content hash (declared schema plus derived columns) and shared,
+    # without copying, by every session of this process. A snapshot already holds the
+    # derived columns and is mapped rather than parsed.
+    if isinstance(_raw, SnapshotFile):
+        with span("mmap"):
+            return _freeze(SurveySnapshot.read_snapshot(_raw))
+    if isinstance(_raw, pd.DataFrame):
+        with span("parse"):
+            return _freeze(add_derived(apply_schema(_raw)))
+    with span("parse"):
+        return _freeze(add_derived(read_survey_csv(_raw if isinstance(_raw, CsvFile) else io.BytesIO(_raw))))
+
+
+def use_local_path(path):
+    # Point the loader at another local CSV (benchmarks, load tests), bypassing any snapshot,
+    # and drop the current copy
+    global LOCAL_PATH, SNAPSHOT_DIR, _sources
+    with _lock:
+        LOCAL_PATH = path
+        SNAPSHOT_DIR = ""
+        _sources = [LocalFileSource(path, STREAMING)]
+        _state.update(raw=None, digest=None, validator=None, source=None, checked=0.0)
+
+
+def dataset_hash():
+    # Content hash of the dataset currently served to the pages
+    return _revalidate()[0]
+
+
+def load_survey_with_hash():
+    # (content hash, survey DataFrame) taken from the same revalidation
+    digest, raw = _revalidate()
+    return digest, _parse(digest, raw)
+
+
+def iter_survey_chunks(chunk_rows=CHUNK_ROWS):
+    # (content hash, iterator of typed frames with derived columns) of the current dataset,
+    # for consumers that must not materialize the whole survey
+    digest, raw = _revalidate()
+    if isinstance(raw, SnapshotFile):
+        return digest, SurveySnapshot.iter_snapshot(raw, chunk_rows)
+    if isinstance(raw, pd.DataFrame):
+        return digest, (add_derived(apply_schema(raw.iloc[i:i + chunk_rows])) for i in range(0, len(raw), chunk_rows))
+    source = raw if isinstance(raw, CsvFile) else io.BytesIO(raw)
+    return digest, (add_derived(chunk) for chunk in read_survey_csv_chunks(source, chunk_rows))
+
+
+def load_survey():
+    # The read-only survey DataFrame (with derived columns) shared by all pages
+    return load_survey_with_hash()[1]
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+# Declared schema of the 23 survey columns.
+# Text answers become categoricals (ordered where the answers have a natural order)
+# and the small integer scales are stored as uint8 instead of int64.
+
+YES_NO = pd.CategoricalDtype(["No", "Yes"])
+
+# Score bands of 'Average marks scored before pandemic in traditional classroom'
+MARKS_BANDS = ["0-10", "11-20", "21-30", "31-40", "41-50", "51-60", "61-70", "71-80", "81-90", "91-100"]
+
+SATISFACTION_LEVELS = ["Bad", "Average", "Good"]
+
+SCHEMA = {
+    "Gender": pd.CategoricalDtype(["Female", "Male"]),
+    "Home Location": pd.CategoricalDtype(["Rural", "Urban"]),
+    "Level of Education": pd.CategoricalDtype(["School", "Under Graduate", "Post Graduate"], ordered=True),
+    "Age(Years)": np.uint8,
+    "Number of Subjects": np.uint8,
+    "Device type used to attend classes": pd.CategoricalDtype(["Desktop", "Laptop", "Mobile"]),
+    "Economic status": pd.CategoricalDtype(["Poor", "Middle Class", "Rich"], ordered=True),
+    "Family size": np.uint8,
+    "Internet facility in your locality": np.uint8,          # 1-5
+    "Are you involved in any sports?": YES_NO,
+    "Do elderly people monitor you?": YES_NO,
+    "Study time (Hours)": np.uint8,
+    "Sleep time (Hours)": np.uint8,
+    "Time spent on social media (Hours)": np.uint8,
+    "Interested in Gaming?": YES_NO,
+    "Have separate room for studying?": YES_NO,
+    "Engaged in group studies?": YES_NO,
+    "Average marks scored before pandemic in traditional classroom": pd.CategoricalDtype(MARKS_BANDS, ordered=True),
+    "Your interaction in online mode": np.uint8,             # 1-5
+    "Clearing doubts with faculties in online mode": np.uint8,  # 1-5
+    "Interested in?": pd.CategoricalDtype(["Theory", "Practical", "Both"]),
+    "Performance in online": np.uint8,                       # 1-10
+    "Your level of satisfaction in Online Education": pd.CategoricalDtype(SATISFACTION_LEVELS, ordered=True),
+}
+
+COLUMNS = list(SCHEMA)
+
+# Columns derived from the survey answers, computed once per dataset version (see add_derived)
+TRADITIONAL_SCORES = {
+    '1-10': 1, '11-20': 2, '21-30': 3, '31-40': 4, '41-50': 5,
+    '51-60': 6, '61-70': 7, '71-80': 8, '81-90': 9, '91-100': 10
+}
+SATISFACTION_SCORES = {'Bad': 1, 'Average': 2, 'Good': 3}
+PERFORMANCE_GROUPS = pd.CategoricalDtype(['Low', 'Medium', 'High'], ordered=True)
+
+DERIVED_SCHEMA = {
+    "Traditional_Score": np.uint8,     # marks band on a 1-10 scale; 0 for bands outside TRADITIONAL_SCORES
+    "Satisfaction_Score": np.uint8,    # Bad = 1, Average = 2, Good = 3; 0 when missing
+    "Performance Group": PERFORMANCE_GROUPS,  # online performance 1-3 / 4-7 / 8-10
+}
+
+# Value range of every integer column; values outside it are treated as missing in aggregates
+RANGES = {
+    "Age(Years)": (0, 99),
+    "Number of Subjects": (0, 40),
+    "Family size": (0, 30),
+    "Internet facility in your locality": (1, 5),
+    "Study time (Hours)": (0, 24),
+    "Sleep time (Hours)": (0, 24),
+    "Time spent on social media (Hours)": (0, 24),
+    "Your interaction in online mode": (1, 5),
+    "Clearing doubts with faculties in online mode": (1, 5),
+    "Performance in online": (1, 10),
+    "Traditional_Score": (1, 10),
+    "Satisfaction_Score": (1, 3),
+}
+
+# dtypes handed to read_csv: text columns are parsed straight into (inferred) categoricals
+READ_DTYPES = {
+    col: ("category" if isinstance(dtype, pd.CategoricalDtype) else dtype)
+    for col, dtype in SCHEMA.items()
+}
+
+
+def domain(col):
+    # Every possible value of a column, in order: declared categories or the integer range
+    dtype = SCHEMA.get(col, DERIVED_SCHEMA.get(col))
+    if isinstance(dtype, pd.CategoricalDtype):
+        return list(dtype.categories)
+    lo, hi = RANGES[col]
+    return list(range(lo, hi + 1))
+
+
+def codes(series):
+    # Position of every row's value in domain(col) as int64; -1 for missing or out-of-range values
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64)
+    lo, hi = RANGES[series.name]
+    values = series.to_numpy().astype(np.int64) - lo
+    return np.where((values >= 0) & (values <= hi - lo), values, -1)
+
+
+def _to_declared(series, dtype):
+    # Re-code a categorical onto the declared categories.
+    # Labels are matched ignoring case and surrounding spaces ('yes' -> 'Yes'); unknown labels become NaN.
+    lookup = {str(c).strip().lower(): i for i, c in enumerate(dtype.categories)}
+    # the trailing -1 keeps missing values (code -1) missing
+    remap = np.array(
+        [lookup.get(str(c).strip().lower(), -1) for c in series.cat.categories] + [-1],
+        dtype=np.int8,
+    )
+    codes = remap[series.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=series.index, name=series.name)
+
+
+def apply_schema(df):
+    # Convert a frame holding the 23 survey columns to the declared dtypes
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Survey data is missing columns: {missing}")
+
+    out = {}
+    for col, dtype in SCHEMA.items():
+        series = df[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype("category")
+            out[col] = _to_declared(series, dtype)
+        else:
+            out[col] = series.astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def validate_responses(df):
+    # A batch of new responses converted to the declared schema; ValueError listing every
+    # problem (missing columns, unknown answers, non-integer or out-of-range numbers)
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Survey data is missing columns: {missing}")
+
+    problems = []
+    raw = df[COLUMNS].copy()
+    for col, dtype in SCHEMA.items():
+        series = raw[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            known = {str(c).strip().lower() for c in dtype.categories}
+            unknown = series.dropna()[~series.dropna().astype(str).str.strip().str.lower().isin(known)]
+            if len(unknown):
+                problems.append(f"{col}: unknown answers {sorted(set(unknown.astype(str)))[:5]}")
+        else:
+            lo, hi = RANGES[col]
+            numbers = pd.to_numeric(series, errors="coerce")
+            bad = numbers.isna() | (numbers % 1 != 0) | (numbers < lo) | (numbers > hi)
+            if bad.any():
+                problems.append(f"{col}: {int(bad.sum())} values that are not whole numbers in {lo}-{hi}")
+            raw[col] = numbers
+    if problems:
+        raise ValueError("Invalid survey responses: " + "; ".join(problems))
+    return apply_schema(raw)
+
+
+def _score(series, scores):
+    # Integer score per categorical answer (0 for answers without a score)
+    lookup = np.array([scores.get(c, 0) for c in series.cat.categories] + [0], dtype=np.uint8)
+    return lookup[series.cat.codes.to_numpy()]
+
+
+def add_derived(df):
+    # The typed survey frame with the derived columns appended
+    out = df.copy(deep=False)
+    out["Traditional_Score"] = _score(df["Average marks scored before pandemic in traditional classroom"], TRADITIONAL_SCORES)
+    out["Satisfaction_Score"] = _score(df["Your level of satisfaction in Online Education"], SATISFACTION_SCORES)
+    out["Performance Group"] = pd.cut(
+        df["Performance in online"], bins=[0, 3, 7, 10], labels=PERFORMANCE_GROUPS.categories
+    ).astype(PERFORMANCE_GROUPS)
+    return out
+
+
+def read_survey_csv(source, **kwargs):
+    # read_csv with the declared schema applied
+    return apply_schema(pd.read_csv(source, dtype=READ_DTYPES, usecols=COLUMNS, **kwargs))
+
+
+def read_survey_csv_chunks(source, chunk_rows, **kwargs):
+    # read_survey_csv, chunk_rows rows at a time
+    with pd.read_csv(source, dtype=READ_DTYPES, usecols=COLUMNS, chunksize=chunk_rows, **kwargs) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk)
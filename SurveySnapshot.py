@@ -0,0 +1,139 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pyarrow as pa
+
+from SurveySchema import add_derived, read_survey_csv
+
+# Columnar snapshots of the survey, for sharing one copy between Streamlit replicas.
+# Ingesting a CSV (the bundled survey or a later wave) writes an uncompressed Arrow IPC
+# (Feather v2) file holding the declared schema plus the derived columns, named after the
+# CSV's content hash, and then points CURRENT at it. SurveyData memory-maps the snapshot
+# CURRENT names instead of parsing the CSV: the column arrays are views into the mapped
+# file, so every process on the host shares the same page-cache pages and a cold start
+# is a mmap rather than a parse.
+#
+#   python SurveySnapshot.py "ONLINE EDUCATION SYSTEM REVIEW.csv"
+#   python SurveySnapshot.py wave2.csv --keep 3
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Directory holding the snapshots and the CURRENT pointer
+SNAPSHOT_DIR = os.environ.get("SURVEY_SNAPSHOT_DIR", os.path.join(HERE, "snapshots"))
+
+POINTER = "CURRENT"
+
+
+def file_digest(path, chunk_bytes=1 << 20):
+    # sha256 of a file, the same hash SurveyData computes for the raw CSV
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_name(digest):
+    return f"survey-{digest[:16]}.arrow"
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def write_snapshot(df, path, digest, source=None):
+    # Write a survey frame as a single-batch Arrow IPC file (one chunk per column, so it maps without copies)
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"survey_digest": digest.encode(),
+        b"survey_source": (source or "").encode(),
+    })
+
+    def write(tmp):
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _write_atomic(path, write)
+
+
+def read_snapshot(path):
+    # Survey frame whose column arrays are views into the memory-mapped snapshot
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def iter_snapshot(path, chunk_rows):
+    # The snapshot as frames of at most chunk_rows rows
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    for start in range(0, table.num_rows, chunk_rows):
+        yield table.slice(start, chunk_rows).to_pandas()
+
+
+def current_snapshot(directory=SNAPSHOT_DIR):
+    # (digest, snapshot path) of the snapshot CURRENT points at, or None
+    try:
+        with open(os.path.join(directory, POINTER)) as f:
+            pointer = json.load(f)
+    except FileNotFoundError:
+        return None
+    return pointer["digest"], os.path.join(directory, pointer["file"])
+
+
+def ingest(csv_path, directory=SNAPSHOT_DIR, keep=None):
+    # Snapshot a survey CSV and make it the current version; returns (digest, snapshot path)
+    os.makedirs(directory, exist_ok=True)
+    digest = file_digest(csv_path)
+    path = os.path.join(directory, snapshot_name(digest))
+    if not os.path.exists(path):
+        write_snapshot(add_derived(read_survey_csv(csv_path)), path, digest, os.path.basename(csv_path))
+
+    def write_pointer(tmp):
+        with open(tmp, "w") as f:
+            json.dump({"digest": digest, "file": os.path.basename(path), "source": os.path.basename(csv_path)}, f)
+
+    _write_atomic(os.path.join(directory, POINTER), write_pointer)
+    if keep:
+        prune(directory, keep)
+    return digest, path
+
+
+def prune(directory, keep):
+    # Delete all but the `keep` newest snapshots (the current one is always kept)
+    current = current_snapshot(directory)
+    snapshots = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".arrow")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for path in snapshots[keep:]:
+        if current is None or path != current[1]:
+            os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a survey CSV into a memory-mappable Arrow snapshot.")
+    parser.add_argument("csv", nargs="?", default=os.path.join(HERE, "ONLINE EDUCATION SYSTEM REVIEW.csv"))
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory (default: %(default)s)")
+    parser.add_argument("--keep", type=int, help="number of snapshots to keep, newest first")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    digest, path = ingest(args.csv, args.dir, args.keep)
+    elapsed = time.perf_counter() - start
+    print(f"{args.csv} -> {path} ({os.path.getsize(path) / 2**20:.1f} MiB, {digest[:16]}) in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import SurveySnapshot
+from PageTimings import span
+from SurveyCube import BACKEND, MEASURES, SurveyCube
+from SurveyData import dataset_hash, iter_survey_chunks
+from SurveySchema import DERIVED_SCHEMA, RANGES, SCHEMA, codes, domain
+
+# SQL backend of the cube, for surveys larger than the dashboard host's memory.
+# Selected with SURVEY_BACKEND=sqlite (standard library) or SURVEY_BACKEND=duckdb (if installed).
+# Every dataset version is loaded once, chunk by chunk, into a database file next to the
+# snapshots: one row per response holding the domain code of every column (NULL = missing)
+# and the per-row value of every cube measure. A SqlCube answers the same queries as
+# SurveyCube with one GROUP BY per combination of dimensions, so only the small
+# aggregated result ever reaches pandas; the sidebar filters become a WHERE clause.
+
+# Directory of the database files (one per dataset version)
+DB_DIR = os.environ.get("SURVEY_DB_DIR", SurveySnapshot.SNAPSHOT_DIR)
+
+TABLE = "survey"
+
+DIMENSIONS = list(SCHEMA) + list(DERIVED_SCHEMA)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _measure_column(measure):
+    return "measure: " + measure
+
+
+def _connect(path, read_only=False):
+    if BACKEND == "duckdb":
+        import duckdb
+        return duckdb.connect(path, read_only=read_only)
+    if BACKEND == "sqlite":
+        if read_only:
+            location = urllib.request.pathname2url(os.path.abspath(path))
+            return sqlite3.connect(f"file:{location}?mode=ro", uri=True, check_same_thread=False)
+        return sqlite3.connect(path, check_same_thread=False)
+    raise ValueError(f"Unknown SURVEY_BACKEND {BACKEND!r}; expected memory, sqlite or duckdb")
+
+
+def _table_rows(chunk):
+    # A chunk of the survey as stored in the table: domain codes and measure values, nullable
+    out = {}
+    for col in DIMENSIONS:
+        col_codes = codes(chunk[col])
+        out[col] = pd.array(col_codes, dtype="Int64")
+        out[col][col_codes < 0] = pd.NA
+    for measure, values in MEASURES.items():
+        out[_measure_column(measure)] = pd.array(values(chunk), dtype="Float64")
+    return pd.DataFrame(out)
+
+
+def _load(con, chunks):
+    columns = [f"{_quote(col)} INTEGER" for col in DIMENSIONS]
+    columns += [f"{_quote(_measure_column(m))} DOUBLE" for m in MEASURES]
+    con.execute(f"CREATE TABLE {TABLE} ({', '.join(columns)})")
+    for chunk in chunks:
+        rows = _table_rows(chunk)
+        if BACKEND == "duckdb":
+            con.register("survey_chunk", rows)
+            con.execute(f"INSERT INTO {TABLE} SELECT * FROM survey_chunk")
+            con.unregister("survey_chunk")
+        else:
+            rows.to_sql(TABLE, con, if_exists="append", index=False)
+    con.commit()
+
+
+def database_path(digest):
+    return os.path.join(DB_DIR, f"survey-{digest[:16]}.{BACKEND}")
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _database_for(digest):
+    # Database file of a dataset version, built on first use (and reused by later processes)
+    path = database_path(digest)
+    if not os.path.exists(path):
+        with span("database"):
+            os.makedirs(DB_DIR, exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}"
+            try:
+                chunk_digest, chunks = iter_survey_chunks()
+                con = _connect(tmp)
+                try:
+                    _load(con, chunks)
+                finally:
+                    con.close()
+                if chunk_digest != digest:
+                    # the source changed while loading: the next rerun builds the new version
+                    raise RuntimeError(f"The survey changed while its database {os.path.basename(path)} was built")
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+    return _Database(path)
+
+
+class _Database:
+    # One read-only connection per thread to a database file
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def query(self, sql, params=()):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._local.con = _connect(self.path, read_only=True)
+        return con.execute(sql, params).fetchall()
+
+
+class SqlCube(SurveyCube):
+    # The SurveyCube queries answered by GROUP BY queries, optionally restricted to a filter.
+    # Results are memoized per combination of dimensions.
+
+    def __init__(self, database, clauses=(), params=()):
+        self.database = database
+        self.clauses, self.params = list(clauses), list(params)
+        self._results = {}
+        self._lock = threading.Lock()
+        self._rows = None
+
+    def _where(self, extra=()):
+        clauses = self.clauses + list(extra)
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._rows = self.database.query(f"SELECT COUNT(*) FROM {TABLE}{self._where()}", self.params)[0][0]
+        return self._rows
+
+    def _aggregate(self, dims):
+        # Dense (counts, {measure: (sums, valid)}) arrays shaped by the domains of dims
+        dims = tuple(dims)
+        with self._lock:
+            if dims in self._results:
+                return self._results[dims]
+
+        columns = [_quote(d) for d in dims]
+        measures = [_quote(_measure_column(m)) for m in MEASURES]
+        select = columns + ["COUNT(*)"] + [f"SUM({m}), COUNT({m})" for m in measures]
+        width = len(dims) + 1 + 2 * len(measures)
+        sql = (
+            f"SELECT {', '.join(select)} FROM {TABLE}"
+            f"{self._where(f'{c} IS NOT NULL' for c in columns)}"
+            f" GROUP BY {', '.join(columns)}"
+        )
+        result = np.array(self.database.query(sql, self.params), dtype=float).reshape(-1, width)
+        result = np.nan_to_num(result)
+
+        shape = tuple(len(domain(d)) for d in dims)
+        flat = np.ravel_multi_index(result[:, :len(dims)].astype(np.int64).T, shape)
+        counts = np.zeros(int(np.prod(shape)), dtype=np.int64)
+        counts[flat] = result[:, len(dims)]
+        sums = {}
+        for i, measure in enumerate(MEASURES):
+            total, valid = np.zeros(counts.shape), np.zeros(counts.shape, dtype=np.int64)
+            total[flat] = result[:, len(dims) + 1 + 2 * i]
+            valid[flat] = result[:, len(dims) + 2 + 2 * i]
+            sums[measure] = (total.reshape(shape), valid.reshape(shape))
+
+        with self._lock:
+            self._results[dims] = (counts.reshape(shape), sums)
+        return self._results[dims]
+
+    def _counts(self, dims):
+        return self._aggregate(dims)[0]
+
+    def _sums(self, measure, dims):
+        return self._aggregate(dims)[1][measure]
+
+    def where(self, key):
+        # This cube restricted to a CrossFilter filter key
+        clauses, params = list(self.clauses), list(self.params)
+        for col, selection in key:
+            if col in RANGES:
+                lo, hi = selection
+                clauses.append(f"{_quote(col)} BETWEEN ? AND ?")
+                params += [int(lo) - RANGES[col][0], int(hi) - RANGES[col][0]]
+            else:
+                labels = domain(col)
+                selected = [labels.index(label) for label in selection if label in labels]
+                clauses.append(f"{_quote(col)} IN ({', '.join('?' * len(selected))})" if selected else "0 = 1")
+                params += selected
+        return SqlCube(self.database, clauses, params)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cube_for(digest):
+    return SqlCube(_database_for(digest))
+
+
+def get_sql_cube():
+    # Unfiltered SQL cube of the current dataset version
+    return _cube_for(dataset_hash())
@@ -0,0 +1,191 @@
+import hashlib
+import math
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Uncertainty of the figures the pages quote: bootstrap confidence intervals and
+# chi-square tests, computed from cube counts rather than from the survey rows.
+# A bootstrap resample of n responses spread over k distinct answers is one multinomial
+# draw of n from the observed proportions, so a batch of resamples is a single
+# (resamples x k) count matrix drawn at once and every statistic (mean, quantiles,
+# proportions) is read off that matrix with array operations. The cost depends on the
+# number of resamples and answers only, not on the number of rows.
+# Batches are seeded from the counts themselves, so a chart shows the same interval on every
+# rerun and in every process, and results are cached by the counts they came from (which
+# identify the dataset version and filter state). With SURVEY_BOOTSTRAP_WORKERS set the
+# batches are drawn in a process pool.
+
+# Resamples per interval
+RESAMPLES = int(os.environ.get("SURVEY_BOOTSTRAP_RESAMPLES", "10000"))
+
+# Resamples per batch (one count matrix)
+BATCH = 2000
+
+# Worker processes drawing the batches (0 = draw them in this process)
+WORKERS = int(os.environ.get("SURVEY_BOOTSTRAP_WORKERS", "0"))
+
+CONFIDENCE = 0.95
+
+# Resample sets kept (each is RESAMPLES floats, or RESAMPLES x k for proportions)
+CACHE_SIZE = 256
+
+
+def _quantile(counts, values, q):
+    # Linear-interpolated quantile (numpy's default method) of every row of a count matrix
+    n = counts.sum(axis=1)
+    cumulative = counts.cumsum(axis=1)
+    position = (n - 1) * q
+    below, above = np.floor(position), np.ceil(position)
+    value_below = values[(cumulative <= below[:, None]).sum(axis=1)]
+    value_above = values[(cumulative <= above[:, None]).sum(axis=1)]
+    return value_below + (position - below) * (value_above - value_below)
+
+
+# Statistic name -> function of (count matrix, distinct values), one result per row
+STATISTICS = {
+    "mean": lambda counts, values: counts @ values / counts.sum(axis=1),
+    "median": lambda counts, values: _quantile(counts, values, 0.5),
+    "iqr": lambda counts, values: _quantile(counts, values, 0.75) - _quantile(counts, values, 0.25),
+    "proportion": lambda counts, values: counts / counts.sum(axis=1, keepdims=True),
+}
+
+
+def _batch(seed, n, p, size, statistic, values):
+    # One batch of resampled statistics (runs in a worker process when the pool is on)
+    counts = np.random.default_rng(seed).multinomial(n, p, size=size)
+    return STATISTICS[statistic](counts, values)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        # spawned, not forked: the server process runs threads
+        _pool = ProcessPoolExecutor(WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def resample(values, counts, statistic, resamples=RESAMPLES, stream=""):
+    # Bootstrap distribution of a statistic of the counted values (array of `resamples` results).
+    # Resamples with different `stream` tags are independent even when the counts are equal
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+    present = counts > 0
+    key = hashlib.sha1(
+        values.tobytes() + counts.tobytes() + f"{statistic}:{resamples}:{stream}".encode()
+    ).digest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    n = int(counts.sum())
+    # answers nobody gave cannot be drawn; proportions keep their slots (always 0)
+    if statistic == "proportion":
+        draw_values, p = values, counts / n
+    else:
+        draw_values, p = values[present], counts[present] / n
+    seeds = np.random.SeedSequence(list(key)).spawn(-(-resamples // BATCH))
+    sizes = [min(BATCH, resamples - i * BATCH) for i in range(len(seeds))]
+    args = [(seed, n, p, size, statistic, draw_values) for seed, size in zip(seeds, sizes)]
+    if WORKERS > 0 and len(args) > 1:
+        batches = list(_executor().map(_batch, *zip(*args)))
+    else:
+        batches = [_batch(*a) for a in args]
+    samples = np.concatenate(batches)
+
+    with _cache_lock:
+        _cache[key] = samples
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return samples
+
+
+def interval(values, counts, statistic, confidence=CONFIDENCE):
+    # (estimate, low, high): the statistic of the counts and its percentile bootstrap interval
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+    estimate = STATISTICS[statistic](counts[None, :], values)[0]
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(resample(values, counts, statistic), [tail, 100 - tail], axis=0)
+    return estimate, low, high
+
+
+def difference(values, counts_a, counts_b, statistic, confidence=CONFIDENCE):
+    # (estimate, low, high, p) of statistic(a) - statistic(b) for two independent groups
+    # (per answer for proportions); p is the two-sided bootstrap p-value of "no difference"
+    values = np.asarray(values, dtype=float)
+    counts_a = np.asarray(counts_a, dtype=np.int64)
+    counts_b = np.asarray(counts_b, dtype=np.int64)
+    estimate = (STATISTICS[statistic](counts_a[None, :], values) - STATISTICS[statistic](counts_b[None, :], values))[0]
+    # each group gets its own stream, or two groups with equal counts would draw identical resamples
+    diffs = resample(values, counts_a, statistic, stream="a") - resample(values, counts_b, statistic, stream="b")
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(diffs, [tail, 100 - tail], axis=0)
+    p = np.minimum(1.0, 2 * np.minimum((diffs <= 0).mean(axis=0), (diffs >= 0).mean(axis=0)))
+    return estimate, low, high, p
+
+
+def _upper_gamma(a, x):
+    # Regularized upper incomplete gamma function Q(a, x) (series below a + 1, continued fraction above)
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        k = a
+        while abs(term) > abs(total) * 1e-15:
+            k += 1
+            term *= x / k
+            total += term
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # modified Lentz evaluation of the continued fraction
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        step = d * c
+        h *= step
+        if abs(step - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi_square(table):
+    # Pearson's chi-square test of independence of a contingency table: (statistic, dof, p)
+    observed = np.asarray(table, dtype=float)
+    observed = observed[observed.sum(axis=1) > 0][:, observed.sum(axis=0) > 0]
+    if observed.shape[0] < 2 or observed.shape[1] < 2:
+        return 0.0, 0, 1.0
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / observed.sum()
+    statistic = float(((observed - expected) ** 2 / expected).sum())
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    return statistic, dof, _upper_gamma(dof / 2, statistic / 2)
+
+
+def format_p(p):
+    return "p < 0.001" if p < 0.001 else f"p = {p:.3f}"
+
+
+def describe_chi_square(table):
+    # One-line summary of the chi-square test of a crosstab, for chart captions
+    statistic, dof, p = chi_square(table)
+    return f"Chi-square test of independence: χ² = {statistic:.1f}, df = {dof}, {format_p(p)}"
@@ -0,0 +1,218 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from SurveySchema import COLUMNS, RANGES, SCHEMA, codes, domain, read_survey_csv
+
+# Synthetic survey responses in the same 23-column schema, for scale and load testing.
+# The model is a small Bayesian network learned from the real survey: every column is
+# drawn either from its marginal distribution or conditioned on one or two "parent"
+# columns, so the relationships the pages chart (interaction vs satisfaction, marks band
+# vs online performance, study time by level and performance, ...) carry over.
+# Sampling uses Walker alias tables, a constant-time vectorized lookup per value,
+# so millions of rows take about a second.
+#
+#   python SyntheticSurvey.py 1000000 survey_1M.csv
+#   python SyntheticSurvey.py 10M survey_10M.parquet --format parquet
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED_PATH = os.path.join(HERE, "ONLINE EDUCATION SYSTEM REVIEW.csv")
+
+LEVEL = "Level of Education"
+AGE = "Age(Years)"
+HOME = "Home Location"
+INTERNET = "Internet facility in your locality"
+INTERACTION = "Your interaction in online mode"
+DOUBTS = "Clearing doubts with faculties in online mode"
+MARKS = "Average marks scored before pandemic in traditional classroom"
+PERFORMANCE = "Performance in online"
+
+# Column -> parent columns it is conditioned on, in sampling order (parents come first)
+PARENTS = {
+    LEVEL: (),
+    AGE: (LEVEL,),
+    "Number of Subjects": (AGE,),
+    "Gender": (),
+    HOME: (),
+    "Economic status": (HOME,),
+    "Device type used to attend classes": (HOME,),
+    "Family size": (AGE,),
+    INTERNET: (HOME,),
+    "Are you involved in any sports?": ("Gender",),
+    "Do elderly people monitor you?": (AGE,),
+    "Time spent on social media (Hours)": (AGE,),
+    "Sleep time (Hours)": ("Time spent on social media (Hours)",),
+    "Interested in Gaming?": ("Gender",),
+    "Have separate room for studying?": (INTERNET,),
+    "Engaged in group studies?": (AGE,),
+    MARKS: (LEVEL,),
+    INTERACTION: (INTERNET,),
+    DOUBTS: (INTERACTION,),
+    "Interested in?": (AGE,),
+    PERFORMANCE: (MARKS, DOUBTS),
+    "Study time (Hours)": (LEVEL, PERFORMANCE),
+    "Your level of satisfaction in Online Education": (INTERACTION, INTERNET),
+}
+
+# Weight of the column's marginal mixed into every conditional table, so parent
+# combinations that are rare (or absent) in the real survey still sample sensibly
+SMOOTHING = 1.0
+
+
+def _alias_table(probabilities):
+    # Walker/Vose alias table of one discrete distribution: (acceptance probability, alias) per slot
+    size = len(probabilities)
+    scaled = probabilities * size
+    accept = np.ones(size)
+    alias = np.arange(size)
+    small = [i for i in range(size) if scaled[i] < 1.0]
+    large = [i for i in range(size) if scaled[i] >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        accept[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return accept, alias
+
+
+class SurveyModel:
+    # Marginal and conditional distributions learned from a survey frame
+
+    def __init__(self, tables):
+        # column -> (acceptance, alias) arrays, each shaped (parent combinations, domain size)
+        self.tables = tables
+
+    @classmethod
+    def fit(cls, df, smoothing=SMOOTHING):
+        row_codes = {col: codes(df[col]) for col in COLUMNS}
+        tables = {}
+        for col, parents in PARENTS.items():
+            size = len(domain(col))
+            child = row_codes[col]
+            known = child >= 0
+            marginal = np.bincount(child[known], minlength=size).astype(float)
+            marginal /= max(marginal.sum(), 1)
+
+            combo, combos = _parent_index(row_codes, parents)
+            known &= combo >= 0
+            counts = np.bincount(
+                combo[known] * size + child[known], minlength=combos * size
+            ).reshape(combos, size).astype(float)
+            probabilities = counts + smoothing * marginal
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            rows = [_alias_table(p) for p in probabilities]
+            tables[col] = (np.array([r[0] for r in rows]), np.array([r[1] for r in rows]))
+        return cls(tables)
+
+    def sample_codes(self, rows, rng):
+        # Domain codes of `rows` synthetic responses, column by column in PARENTS order
+        sampled = {}
+        for col, parents in PARENTS.items():
+            accept, alias = self.tables[col]
+            size = accept.shape[1]
+            combo = _parent_index(sampled, parents, rows)[0]
+            # One uniform per row picks the slot (integer part) and the accept/alias coin (fraction)
+            draw = rng.random(rows, dtype=np.float32) * np.float32(size)
+            slot = np.minimum(draw.astype(np.int32), size - 1)
+            flat = combo * size + slot
+            sampled[col] = np.where(draw - slot < accept.ravel()[flat], slot, alias.ravel()[flat])
+        return sampled
+
+    def sample(self, rows, rng):
+        # DataFrame of `rows` synthetic responses with the declared schema dtypes
+        sampled = self.sample_codes(rows, rng)
+        out = {}
+        for col in COLUMNS:
+            dtype = SCHEMA[col]
+            if isinstance(dtype, pd.CategoricalDtype):
+                out[col] = pd.Categorical.from_codes(sampled[col].astype(np.int8), dtype=dtype)
+            else:
+                out[col] = (sampled[col] + RANGES[col][0]).astype(dtype)
+        return pd.DataFrame(out)
+
+    def stream(self, rows, chunk_rows=1_000_000, seed=0):
+        # Yield the synthetic survey in DataFrame chunks of at most chunk_rows rows
+        rng = np.random.default_rng(seed)
+        for start in range(0, rows, chunk_rows):
+            yield self.sample(min(chunk_rows, rows - start), rng)
+
+
+def _parent_index(row_codes, parents, rows=None):
+    # Combined code of the parent columns per row (-1 if any parent is missing) and the number of combinations
+    if not parents:
+        n = rows if rows is not None else len(next(iter(row_codes.values())))
+        return np.zeros(n, dtype=np.int64), 1
+    shape = tuple(len(domain(p)) for p in parents)
+    cols = [row_codes[p] for p in parents]
+    present = np.logical_and.reduce([c >= 0 for c in cols])
+    combo = np.ravel_multi_index(cols, shape, mode="clip")
+    return np.where(present, combo, -1), int(np.prod(shape))
+
+
+def load_model(path=SEED_PATH):
+    # Model learned from the bundled survey (or another CSV in the same schema)
+    return SurveyModel.fit(read_survey_csv(path))
+
+
+def generate(rows, seed=0, model=None):
+    # A whole synthetic survey frame in one go
+    model = model or load_model()
+    return model.sample(rows, np.random.default_rng(seed))
+
+
+def write_csv(path, rows, chunk_rows=1_000_000, seed=0, model=None):
+    model = model or load_model()
+    for i, chunk in enumerate(model.stream(rows, chunk_rows, seed)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def write_parquet(path, rows, chunk_rows=1_000_000, seed=0, model=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    model = model or load_model()
+    writer = None
+    try:
+        for chunk in model.stream(rows, chunk_rows, seed):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def parse_rows(text):
+    # '1000', '1k', '10M'
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic survey in the dashboard's 23-column schema.")
+    parser.add_argument("rows", type=parse_rows, help="number of responses, e.g. 100000, 1M, 10M")
+    parser.add_argument("output", help="output file")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="defaults to the output file extension")
+    parser.add_argument("--chunk-rows", type=parse_rows, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default=SEED_PATH, help="survey CSV to learn the distributions from")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    writer = write_parquet if fmt == "parquet" else write_csv
+
+    start = time.perf_counter()
+    writer(args.output, args.rows, args.chunk_rows, args.seed, load_model(args.source))
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows:,} rows to {args.output} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Render from the CSV in the repository, without the background warm-up
+os.environ.setdefault("SURVEY_PREWARM", "0")
+os.environ.setdefault("SURVEY_SNAPSHOT_DIR", "")
+
+from streamlit.testing.v1 import AppTest
+
+
+def _chart_titles(page, **session_state):
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+    for name, value in session_state.items():
+        at.session_state[name] = value
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return [json.loads(chart.proto.spec)["layout"]["title"]["text"] for chart in at.get("plotly_chart")]
+
+
+def test_pages_with_the_same_chart_name_keep_their_own_figures():
+    # Homepage and StudentChallenge both name a chart "economic_status"; the figure cache
+    # is shared by the whole process, so the second page must not get the first page's figure
+    home = _chart_titles("Homepage.py")
+    challenge = _chart_titles("StudentChallenge.py")
+
+    assert "5. Economic Status Distribution" in home
+    assert "Online Performance by Economic Status (Grouped)" in challenge
+    assert "5. Economic Status Distribution" not in challenge
+
+
+def test_cached_figures_are_reused_on_later_runs():
+    from ResultCache import cache_stats
+
+    first = _chart_titles("StudentSatisfaction.py")
+    hits = cache_stats()["figures"]["hits"]
+    assert _chart_titles("StudentSatisfaction.py") == first
+    assert cache_stats()["figures"]["hits"] == hits + len(first)
+
+
+def test_charts_that_ignore_the_filters_are_shared_by_every_filter_choice():
+    # The association matrix covers all responses, so a session with sidebar filters set
+    # gets the figures another session built without them
+    from ResultCache import cache_stats
+
+    first = _chart_titles("AssociationMatrix.py")
+    hits = cache_stats()["figures"]["hits"]
+    assert _chart_titles("AssociationMatrix.py", **{"filter:Gender": ["Female"]}) == first
+    assert cache_stats()["figures"]["hits"] == hits + len(first)
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Load the CSV in the repository
+os.environ.setdefault("SURVEY_SNAPSHOT_DIR", "")
+
+from SurveyData import load_survey
+
+# Every way of changing the shared survey frame in place; each must fail and leave the
+# frame as it was for the other sessions
+MUTATIONS = {
+    "setitem": lambda df: df.__setitem__("Gender", "x"),
+    "new column": lambda df: df.__setitem__("extra", 1),
+    "delitem": lambda df: df.__delitem__("Gender"),
+    "insert": lambda df: df.insert(0, "extra", 1),
+    "pop": lambda df: df.pop("Gender"),
+    "columns setter": lambda df: setattr(df, "columns", [str(i) for i in range(df.shape[1])]),
+    "index setter": lambda df: setattr(df, "index", range(1, len(df) + 1)),
+    "column attribute": lambda df: setattr(df, "Gender", "x"),
+    "rename inplace": lambda df: df.rename(columns={"Gender": "Sex"}, inplace=True),
+    "drop inplace": lambda df: df.drop(columns=["Gender"], inplace=True),
+    "drop rows inplace": lambda df: df.drop(index=[0], inplace=True),
+    "fillna inplace": lambda df: df.fillna(0, inplace=True),
+    "replace inplace": lambda df: df.replace("Male", "Female", inplace=True),
+    "sort_values inplace": lambda df: df.sort_values("Gender", inplace=True),
+    "set_index inplace": lambda df: df.set_index("Gender", inplace=True),
+    "reset_index inplace": lambda df: df.reset_index(inplace=True),
+    "dropna inplace": lambda df: df.dropna(inplace=True),
+    "query inplace": lambda df: df.query("`Age(Years)` > 20", inplace=True),
+    "loc write": lambda df: df.loc.__setitem__((0, "Age(Years)"), 99),
+    "iloc write": lambda df: df.iloc.__setitem__((0, 1), df.iloc[1, 1]),
+    "update": lambda df: df.update(df.head(1)),
+}
+
+
+@pytest.fixture(scope="module")
+def shared():
+    df = load_survey()
+    return df, df.copy()
+
+
+@pytest.mark.parametrize("mutation", list(MUTATIONS))
+def test_shared_frame_cannot_be_changed_in_place(shared, mutation):
+    df, original = shared
+    with pytest.raises((TypeError, ValueError)):
+        MUTATIONS[mutation](df)
+    assert load_survey() is df
+    assert list(df.columns) == list(original.columns)
+    assert df.index.equals(original.index)
+    assert df.equals(original)
+    assert "Gender" not in vars(df)
+
+
+def test_derived_frames_are_ordinary_and_writable():
+    df = load_survey()
+    derived = df.rename(columns={"Gender": "Sex"})
+    derived["extra"] = 1
+    derived.columns = [c.upper() for c in derived.columns]
+    assert type(derived).__name__ == "DataFrame"
+    assert "Gender" in df.columns
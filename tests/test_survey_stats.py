@@ -0,0 +1,30 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SurveyStats import difference, interval
+
+
+def test_groups_with_equal_counts_are_resampled_independently():
+    # Two groups with the same answers still vary independently under resampling, so the
+    # interval of their difference spans zero instead of collapsing onto it
+    values = [1, 2, 3, 4, 5]
+    counts = [30, 50, 80, 60, 20]
+    estimate, low, high, p = difference(values, counts, counts, "mean")
+
+    assert estimate == 0
+    assert low < 0 < high
+    assert 0.5 < p <= 1
+
+
+def test_difference_interval_matches_the_spread_of_each_group():
+    # Independent groups: the difference of means spreads about sqrt(2) times as wide as one mean
+    values = [1, 2, 3, 4, 5]
+    counts = [30, 50, 80, 60, 20]
+    _, low, high = interval(values, counts, "mean")
+    _, diff_low, diff_high, _ = difference(values, counts, counts, "mean")
+
+    assert np.isclose((diff_high - diff_low) / (high - low), np.sqrt(2), rtol=0.1)